@@ -0,0 +1,197 @@
+"""模擬器熱點路徑的效能基準，結果以 JSON 輸出，並可與基準檔比較找出效能退化
+
+用法：
+    python benchmarks/bench_hotpaths.py --output bench.json
+    python benchmarks/bench_hotpaths.py --compare baseline.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from blackjack_simulation import BlackjackSimulator  # noqa: E402
+from deck import Deck  # noqa: E402
+from strategy_registry import registry, HIT, RULE  # noqa: E402
+
+PLAYER_COUNTS = [1, 4]
+
+
+def best_of(func, repeat):
+    """執行 func 數次，返回最短耗時（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_deck(scale, repeat):
+    deck = Deck(6, seed=1)
+    draws = 300000 * scale
+
+    def draw():
+        for _ in range(draws):
+            deck.draw()
+
+    shuffles = 5000 * scale
+
+    def shuffle():
+        for _ in range(shuffles):
+            deck.shuffle()
+
+    queries = 300000 * scale
+
+    def remaining():
+        for _ in range(queries):
+            deck.get_remaining_cards()
+
+    return {
+        'deck.draw': (draws, best_of(draw, repeat)),
+        'deck.shuffle': (shuffles, best_of(shuffle, repeat)),
+        'deck.get_remaining_cards': (queries, best_of(remaining, repeat))
+    }
+
+
+def sample_hands(count):
+    """以固定種子抽出代表性的起始手牌（牌碼列表）"""
+    deck = Deck(6, seed=2)
+    hands = []
+    for _ in range(count):
+        if deck.remaining_count() < 10:
+            deck.shuffle()
+        hands.append([deck.draw(), deck.draw()])
+    return hands
+
+
+def bench_strategies(scale, repeat):
+    simulator = BlackjackSimulator()
+    hands = sample_hands(1000)
+    deck = Deck(6, seed=3)
+    for _ in range(100):
+        deck.draw()
+    loops = 50 * scale
+    calls = loops * len(hands)
+
+    def calculate_total():
+        for _ in range(loops):
+            for hand in hands:
+                simulator.calculate_total(hand)
+
+    results = {'simulator.calculate_total': (calls, best_of(calculate_total, repeat))}
+    # 與 simulate_hand 相同的編譯路徑：查表，只有 RULE 狀態才呼叫組成規則
+    states = [simulator.hand_state(hand) for hand in hands]
+    for strategy_name in registry.names():
+        strategy = simulator.get_strategy(strategy_name)
+        actions = strategy.actions
+        rule = simulator.strategy_rule(strategy)
+
+        def decide():
+            for _ in range(loops):
+                for total, soft in states:
+                    action = actions[total * 2 + soft]
+                    if action == RULE:
+                        rule(total, soft, deck)
+                    else:
+                        action == HIT
+
+        results[f'strategy.{strategy_name}'] = (calls, best_of(decide, repeat))
+
+    # 以剩餘牌計數表示狀態的完整決策 Strategy.decision（解析引擎與外部呼叫者使用的路徑）
+    rank_counts, total_cards = deck.rank_counts, deck.remaining_count()
+    for strategy_name in registry.names():
+        decision = simulator.get_strategy(strategy_name).decision(simulator)
+
+        def decide():
+            for _ in range(loops):
+                for total, soft in states:
+                    decision(total, soft, rank_counts, total_cards)
+
+        results[f'strategy_decision.{strategy_name}'] = (calls, best_of(decide, repeat))
+    return results
+
+
+def bench_run_simulation(scale, repeat):
+    results = {}
+    for strategy_name in registry.names():
+        for num_players in PLAYER_COUNTS:
+            num_hands = 20000 * scale // num_players
+
+            def run():
+                simulator = BlackjackSimulator(keep_results=False, log_capacity=0)
+                simulator.run_simulation(strategy_name, num_hands, num_players, seed=1)
+
+            results[f'run_simulation.{strategy_name}.players{num_players}'] = (
+                num_hands * num_players, best_of(run, repeat)
+            )
+    return results
+
+
+def run_benchmarks(scale=1, repeat=3):
+    measured = {}
+    measured.update(bench_deck(scale, repeat))
+    measured.update(bench_strategies(scale, repeat))
+    measured.update(bench_run_simulation(scale, repeat))
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'scale': scale,
+            'repeat': repeat
+        },
+        'results': {
+            name: {'operations': operations, 'seconds': seconds, 'ops_per_sec': operations / seconds}
+            for name, (operations, seconds) in measured.items()
+        }
+    }
+
+
+def compare(current, baseline, threshold):
+    """比較每秒操作數，低於基準 (1 - threshold) 倍者視為退化；返回退化項目列表"""
+    regressions = []
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        ratio = result['ops_per_sec'] / baseline['results'][name]['ops_per_sec']
+        flag = "退化" if ratio < 1 - threshold else ""
+        print(f"{name:<40} {ratio:6.2f}x {flag}")
+        if ratio < 1 - threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="模擬器熱點路徑效能基準")
+    parser.add_argument('--output', help="將結果寫入 JSON 檔（可作為日後比較的基準）")
+    parser.add_argument('--compare', help="與指定的基準 JSON 檔比較")
+    parser.add_argument('--threshold', type=float, default=0.1, help="允許的效能下降比例（預設 0.1）")
+    parser.add_argument('--scale', type=int, default=1, help="工作量倍數")
+    parser.add_argument('--repeat', type=int, default=3, help="每項重複次數（取最佳值）")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.scale, args.repeat)
+    for name, result in current['results'].items():
+        print(f"{name:<40} {result['ops_per_sec']:>14,.0f} ops/s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=4)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n與基準 {args.compare} 比較（比值 = 目前 / 基準）：")
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n效能退化：{', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
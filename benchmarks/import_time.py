@@ -0,0 +1,71 @@
+"""測量 GUI 與無圖形介面入口的冷啟動匯入時間，超出預算時以非零狀態結束
+
+用法：python benchmarks/import_time.py [--repeat 5] [--output import_time.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+
+# 入口模組與匯入時間預算（毫秒）；matplotlib 等繪圖模組須延遲到首次繪圖才載入
+BUDGETS = {
+    'headless': {'module': 'cli', 'budget_ms': 250, 'forbidden': ['tkinter', 'ttkbootstrap', 'PIL', 'matplotlib']},
+    'gui': {'module': 'gui', 'budget_ms': 400, 'forbidden': ['matplotlib']}
+}
+
+
+def measure_import(module):
+    """在新的直譯器中以 -X importtime 測量模組累計匯入時間（毫秒）"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    for line in reversed(completed.stderr.splitlines()):
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"無法解析 {module} 的匯入時間")
+
+
+def loaded_modules(module, candidates):
+    """返回匯入 module 後已載入的 candidates 模組"""
+    code = f"import sys, {module}; print(','.join(m for m in {candidates!r} if m in sys.modules))"
+    completed = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    return [name for name in completed.stdout.strip().split(',') if name]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="入口模組匯入時間預算檢查")
+    parser.add_argument('--repeat', type=int, default=5, help="每個入口測量次數（取最小值）")
+    parser.add_argument('--output', help="將結果寫入 JSON 檔")
+    args = parser.parse_args(argv)
+
+    results = {}
+    failed = False
+    for path, config in BUDGETS.items():
+        elapsed = min(measure_import(config['module']) for _ in range(args.repeat))
+        forbidden = loaded_modules(config['module'], config['forbidden'])
+        passed = elapsed <= config['budget_ms'] and not forbidden
+        failed |= not passed
+        results[path] = {
+            'module': config['module'],
+            'import_ms': round(elapsed, 1),
+            'budget_ms': config['budget_ms'],
+            'forbidden_loaded': forbidden,
+            'passed': passed
+        }
+        status = "通過" if passed else "超出預算"
+        print(f"{path:<9} import {config['module']:<4} {elapsed:7.1f} ms / 預算 {config['budget_ms']} ms  {status}"
+              + (f"（不應載入：{', '.join(forbidden)}）" if forbidden else ""))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,49 +1,213 @@
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib import font_manager
 import os
+from result_store import column_histogram
+from streaming_stats import StreamingStats
+from strategy_registry import registry
 
 class AnalysisReport:
+    confidence = 0.95
+    bootstrap_samples = 1000
+
     @staticmethod
-    def generate_report(results, expected_values, num_players):
-        """生成分析報告"""
-        report = "# 21點莊家策略模擬分析報告\n\n"
-        report += "## 模擬設定\n"
-        report += f"- 牌數：6副牌（共312張牌）\n"
-        report += "- 洗牌規則：剩餘牌數低於40%時自動洗牌\n"
+    def generate_report(results, expected_values, num_players, exact_distributions=None,
+                        report_dir='reports', img_dir='img', metadata=None):
+        """生成分析報告並繪製期望值比較圖；exact_distributions 為 DealerProbabilityEngine 的精確分佈 {策略: 分佈}"""
+        report = AnalysisReport.build_report(results, expected_values, num_players, exact_distributions, metadata)
+        AnalysisReport.save_report(report, os.path.join(report_dir, 'analysis_report.md'))
+        AnalysisReport.plot_expected_values(results, expected_values, img_dir)
+        return report
+
+    @staticmethod
+    def histogram(result):
+        """將一位玩家的結果轉為最終點數直方圖；result 可為 StreamingStats、列表或 numpy 陣列（含 memmap，分塊計算）"""
+        if isinstance(result, StreamingStats):
+            return np.array(result.histogram, dtype=np.int64)
+        return column_histogram(result)
+
+    @staticmethod
+    def summarize(histograms, seed=0):
+        """由直方圖矩陣（每列一組）一次計算局數、爆牌率、平均點數（即期望值）、標準誤與 bootstrap 信賴區間
+
+        bootstrap 由各組直方圖做多項分佈重抽樣，成本與局數無關。
+        """
+        histograms = np.atleast_2d(histograms)
+        values = np.minimum(np.arange(histograms.shape[1]), 21)
+        bust_mask = np.arange(histograms.shape[1]) > 21
+        counts = histograms.sum(axis=1)
+        safe_counts = np.maximum(counts, 1)
+        bust_rate = histograms[:, bust_mask].sum(axis=1) / safe_counts
+        mean = histograms @ values / safe_counts
+        second = histograms @ (values ** 2) / safe_counts
+        variance = np.maximum(second - mean ** 2, 0) * safe_counts / np.maximum(counts - 1, 1)
+        mean_se = np.sqrt(variance / safe_counts)
+        bust_se = np.sqrt(bust_rate * (1 - bust_rate) / safe_counts)
+
+        rng = np.random.default_rng(seed)
+        alpha = (1 - AnalysisReport.confidence) / 2
+        bust_ci = np.zeros((len(histograms), 2))
+        mean_ci = np.zeros((len(histograms), 2))
+        for i, (histogram, count) in enumerate(zip(histograms, counts)):
+            if count == 0:
+                continue
+            samples = rng.multinomial(count, histogram / count, size=AnalysisReport.bootstrap_samples)
+            bust_ci[i] = np.quantile(samples[:, bust_mask].sum(axis=1) / count, [alpha, 1 - alpha])
+            mean_ci[i] = np.quantile(samples @ values / count, [alpha, 1 - alpha])
+        return {
+            'count': counts, 'bust_rate': bust_rate, 'bust_se': bust_se, 'bust_ci': bust_ci,
+            'mean': mean, 'mean_se': mean_se, 'mean_ci': mean_ci
+        }
+
+    @staticmethod
+    def paired_comparison(strategy_a, strategy_b, shoes_a, shoes_b):
+        """共同隨機數模式的配對比較：以 (玩家, 牌靴) 為配對單位計算 a - b 的差異
+
+        shoes_x 為 {玩家: [[局數, 爆牌數, 點數和], ...]}；同一玩家的第 k 個牌靴在兩個策略中牌序相同。
+        返回差異的平均、配對標準誤、常態近似信賴區間，以及相對於獨立樣本的變異數縮減倍數。
+        """
+        pairs_a, pairs_b = [], []
+        for pid in shoes_a:
+            common = min(len(shoes_a[pid]), len(shoes_b.get(pid, [])))
+            pairs_a.extend(shoes_a[pid][:common])
+            pairs_b.extend(shoes_b[pid][:common])
+        a = np.array(pairs_a, dtype=np.float64).reshape(-1, 3)
+        b = np.array(pairs_b, dtype=np.float64).reshape(-1, 3)
+        shoes = len(a)
+        z = 1.959963984540054  # 95% 常態分位數
+        comparison = {'strategy_a': strategy_a, 'strategy_b': strategy_b, 'shoes': shoes}
+        for name, column in (('bust_rate', 1), ('expected_value', 2)):
+            values_a = a[:, column] / np.maximum(a[:, 0], 1)
+            values_b = b[:, column] / np.maximum(b[:, 0], 1)
+            diff = values_a - values_b
+            if shoes > 1:
+                paired_se = diff.std(ddof=1) / np.sqrt(shoes)
+                unpaired_se = np.sqrt((values_a.var(ddof=1) + values_b.var(ddof=1)) / shoes)
+            else:
+                paired_se = unpaired_se = float('nan')
+            mean = float(diff.mean()) if shoes else float('nan')
+            comparison[name] = {
+                'difference': mean,
+                'se': float(paired_se),
+                'ci': (mean - z * paired_se, mean + z * paired_se),
+                'variance_reduction': float(unpaired_se ** 2 / paired_se ** 2) if paired_se > 0 else float('nan')
+            }
+        return comparison
+
+    @staticmethod
+    def paired_section(comparisons):
+        """產生「配對比較」段落"""
+        strategies_cn = registry.descriptions()
+        report = "\n## 配對比較（共同隨機數，以牌靴為配對單位）\n"
+        report += "| 策略 A | 策略 B | 牌靴數 | 爆牌率差 (A-B) | 95% CI | 期望值差 (A-B) | 95% CI | 變異數縮減倍數 |\n"
+        report += "|--------|--------|--------|----------------|--------|----------------|--------|----------------|\n"
+        for c in comparisons:
+            bust, ev = c['bust_rate'], c['expected_value']
+            report += (f"| {strategies_cn[c['strategy_a']]} | {strategies_cn[c['strategy_b']]} | {c['shoes']} "
+                       f"| {bust['difference']:+.2%} | {bust['ci'][0]:+.2%} – {bust['ci'][1]:+.2%} "
+                       f"| {ev['difference']:+.3f} | {ev['ci'][0]:+.3f} – {ev['ci'][1]:+.3f} "
+                       f"| {ev['variance_reduction']:.1f} |\n")
+        return report
+
+    @staticmethod
+    def settings_section(metadata, num_players, hands_per_player):
+        """依實際執行參數產生「模擬設定」段落；未提供的參數以資料推算或標示為未提供"""
+        metadata = metadata or {}
+        report = "## 模擬設定\n"
+        decks = metadata.get('decks')
+        if decks is not None:
+            report += f"- 牌數：{decks}副牌（共{decks * 52}張牌）\n"
+        else:
+            report += "- 牌數：未提供\n"
+        threshold = metadata.get('shuffle_threshold')
+        threshold_text = f"（{threshold}張）" if threshold is not None else ""
+        ratio = metadata.get('shuffle_ratio', 0.4)
+        report += f"- 洗牌規則：剩餘牌數低於{ratio:.0%}{threshold_text}時自動洗牌\n"
         report += "- 莊家起始牌：2張\n"
-        report += f"- 模擬局數：每種策略每玩家1000局，總計{1000 * num_players}局/策略\n"
-        report += f"- 模擬人數：{num_players}人\n\n"
+        hands = metadata.get('hands', hands_per_player)
+        report += f"- 模擬局數：每種策略每玩家{hands}局，總計{hands * num_players}局/策略\n"
+        report += f"- 模擬人數：{num_players}人\n"
+        targets = [f"爆牌率 ±{metadata['target_bust_halfwidth']:.2%}"] if metadata.get('target_bust_halfwidth') else []
+        if metadata.get('target_ev_halfwidth'):
+            targets.append(f"期望值 ±{metadata['target_ev_halfwidth']}")
+        if targets:
+            report += f"- 目標精度：95%信賴區間半寬 {'、'.join(targets)}，達成即停止（上述局數為上限）\n"
+        if metadata.get('seed') is not None:
+            report += f"- 隨機種子：{metadata['seed']}\n"
+        if metadata.get('elapsed_seconds') is not None:
+            report += f"- 模擬耗時：{metadata['elapsed_seconds']:.2f} 秒\n"
+        if metadata.get('cached_strategies'):
+            cached = '、'.join(registry.descriptions().get(s, s) for s in metadata['cached_strategies'])
+            report += f"- 取自執行目錄：{cached}（參數相同的先前執行結果，未重新模擬）\n"
+        return report + "\n"
+
+    @staticmethod
+    def build_report(results, expected_values, num_players, exact_distributions=None, metadata=None, paired=None):
+        """產生 Markdown 報告文字（不繪圖，不需載入 matplotlib）
+
+        results 的每位玩家結果可為 StreamingStats、列表或 numpy 陣列（例如 ResultStore 的 memmap 欄位），
+        先彙總為直方圖後以向量化方式計算所有統計；metadata 為實際執行參數（牌數、局數、種子等）；
+        paired 為共同隨機數模式的配對比較列表（BlackjackSimulator.paired_statistics() 的結果）。
+        """
+        strategies_cn = registry.descriptions()
+        percent = int(AnalysisReport.confidence * 100)
+        player_ids = {strategy: list(player_results) for strategy, player_results in results.items()}
+        player_hist = {
+            strategy: np.array([AnalysisReport.histogram(result) for result in player_results.values()])
+            for strategy, player_results in results.items() if player_results
+        }
+        strategy_hist = {strategy: hist.sum(axis=0) for strategy, hist in player_hist.items()}
+        player_summary = {strategy: AnalysisReport.summarize(hist) for strategy, hist in player_hist.items()}
+        strategy_summary = {}
+        if strategy_hist:
+            names = list(strategy_hist)
+            combined = AnalysisReport.summarize(np.array([strategy_hist[name] for name in names]))
+            strategy_summary = {name: {key: value[i] for key, value in combined.items()} for i, name in enumerate(names)}
+        hands_per_player = max((int(hist.sum(axis=1).max()) for hist in player_hist.values()), default=0)
+
+        report = "# 21點莊家策略模擬分析報告\n\n"
+        report += AnalysisReport.settings_section(metadata, num_players, hands_per_player)
         
         report += "## 策略比較\n"
-        strategies_cn = {
-            'basic': '基本策略 (17點停牌)',
-            'conservative': '保守策略 (16點停牌)',
-            'aggressive': '激進策略 (18點停牌)',
-            'adaptive': '自適應策略 (基於爆牌概率)',
-            'advanced': '高級自適應策略 (基於期望值)'
-        }
+        report += f"| 策略 | 玩家 | 局數 | 爆牌率 | 爆牌率 {percent}% CI | 平均點數 | 期望值 | 標準誤 | 期望值 {percent}% CI |\n"
+        report += "|------|------|------|--------|------------|----------|--------|--------|------------|\n"
         
-        report += "| 策略 | 玩家 | 爆牌率 | 平均點數 | 期望值 |\n"
-        report += "|------|------|--------|----------|--------|\n"
+        for strategy, summary in player_summary.items():
+            for i, player_id in enumerate(player_ids[strategy]):
+                bust_lo, bust_hi = summary['bust_ci'][i]
+                mean_lo, mean_hi = summary['mean_ci'][i]
+                ev = expected_values.get(strategy, {}).get(player_id, summary['mean'][i])
+                report += (f"| {strategies_cn[strategy]} | 玩家 {player_id} | {summary['count'][i]} "
+                           f"| {summary['bust_rate'][i]:.2%} | {bust_lo:.2%} – {bust_hi:.2%} "
+                           f"| {summary['mean'][i]:.2f} | {ev:.2f} | {summary['mean_se'][i]:.3f} "
+                           f"| {mean_lo:.2f} – {mean_hi:.2f} |\n")
         
-        for strategy, player_results in results.items():
-            for player_id, result in player_results.items():
-                bust_rate = sum(1 for x in result if x > 21) / len(result)
-                avg_points = sum(min(x, 21) for x in result) / len(result)
-                ev = expected_values[strategy][player_id]
-                report += f"| {strategies_cn[strategy]} | 玩家 {player_id} | {bust_rate:.2%} | {avg_points:.2f} | {ev:.2f} |\n"
+        report += "\n## 總結（所有玩家合計）\n"
+        report += f"| 策略 | 局數 | 爆牌率 | 標準誤 | 爆牌率 {percent}% CI | 平均期望值 | 標準誤 | 期望值 {percent}% CI |\n"
+        report += "|------|------|--------|--------|------------|------------|--------|------------|\n"
         
-        report += "\n## 總結（所有玩家平均）\n"
-        report += "| 策略 | 平均爆牌率 | 平均點數 | 平均期望值 |\n"
-        report += "|------|------------|----------|------------|\n"
+        for strategy, summary in strategy_summary.items():
+            bust_lo, bust_hi = summary['bust_ci']
+            mean_lo, mean_hi = summary['mean_ci']
+            report += (f"| {strategies_cn[strategy]} | {summary['count']} | {summary['bust_rate']:.2%} "
+                       f"| {summary['bust_se']:.2%} | {bust_lo:.2%} – {bust_hi:.2%} "
+                       f"| {summary['mean']:.2f} | {summary['mean_se']:.3f} | {mean_lo:.2f} – {mean_hi:.2f} |\n")
         
-        for strategy in results:
-            all_results = [r for pid in results[strategy] for r in results[strategy][pid]]
-            bust_rate = sum(1 for x in all_results if x > 21) / len(all_results)
-            avg_points = sum(min(x, 21) for x in all_results) / len(all_results)
-            ev = np.mean([expected_values[strategy][pid] for pid in expected_values[strategy]])
-            report += f"| {strategies_cn[strategy]} | {bust_rate:.2%} | {avg_points:.2f} | {ev:.2f} |\n"
+        if exact_distributions:
+            from dealer_probability import DealerProbabilityEngine
+            report += "\n## 理論值對照（完整牌堆開局的精確計算）\n"
+            report += "| 策略 | 理論爆牌率 | 模擬爆牌率 | 理論期望值 | 模擬期望值 |\n"
+            report += "|------|------------|------------|------------|------------|\n"
+            for strategy, distribution in exact_distributions.items():
+                exact_bust = DealerProbabilityEngine.bust_rate(distribution)
+                exact_ev = DealerProbabilityEngine.expected_value(distribution)
+                if strategy in strategy_summary:
+                    sim_bust = f"{strategy_summary[strategy]['bust_rate']:.2%}"
+                    sim_ev = f"{strategy_summary[strategy]['mean']:.2f}"
+                else:
+                    sim_bust = sim_ev = "-"
+                report += f"| {strategies_cn[strategy]} | {exact_bust:.2%} | {sim_bust} | {exact_ev:.2f} | {sim_ev} |\n"
+        
+        if paired:
+            report += AnalysisReport.paired_section(paired)
         
         report += "\n## 分析\n"
         report += "1. **爆牌率比較**：\n"
@@ -53,8 +217,6 @@ class AnalysisReport:
         report += "- 多玩家模擬顯示爆牌率在玩家間略有變動，但整體趨勢一致。\n\n"
         
         report += "2. **期望值比較**：\n"
-       想了想，還是將以下內容進行完整的呈現：
-
         report += "- 高級自適應策略平均期望值最高，因基於剩餘牌動態優化決策。\n"
         report += "- 基本策略期望值穩定，適合標準規則。\n"
         report += "- 保守策略期望值較低，因平均點數偏低。\n"
@@ -71,25 +233,21 @@ class AnalysisReport:
         report += "## 結論\n"
         report += "綜合爆牌率、平均點數和期望值，**高級自適應策略**是最優選擇，適合多玩家場景。基本策略作為標準策略表現穩定。莊家應避免保守或激進策略，因其長期效果不佳。\n"
         
-        # 儲存報告
-        os.makedirs('reports', exist_ok=True)
-        report_path = os.path.join('reports', 'analysis_report.md')
+        return report
+
+    @staticmethod
+    def save_report(report, report_path):
+        """將報告寫入檔案"""
+        os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
         with open(report_path, 'w', encoding='utf-8') as f:
             f.write(report)
-        
-        # 繪製期望值比較圖
-        font_path = "C:/Windows/Fonts/msjh.ttc"
-        try:
-            if os.path.exists(font_path):
-                font_manager.fontManager.addfont(font_path)
-                prop = font_manager.FontProperties(fname=font_path)
-                plt.rcParams['font.family'] = prop.get_name()
-            else:
-                print("警告：未找到微軟正黑體，使用預設字型")
-                plt.rcParams['font.family'] = 'sans-serif'
-        except Exception as e:
-            print(f"字型載入失敗: {e}，使用預設字型")
-            plt.rcParams['font.family'] = 'sans-serif'
+
+    @staticmethod
+    def plot_expected_values(results, expected_values, img_dir='img'):
+        """繪製各策略平均期望值比較圖（僅在此時載入 matplotlib）"""
+        from result_plotter import load_pyplot
+        plt = load_pyplot()
+        strategies_cn = registry.descriptions()
 
         plt.figure(figsize=(12, 8))
         strategies = list(results.keys())
@@ -99,7 +257,6 @@ class AnalysisReport:
         plt.xlabel('策略')
         plt.ylabel('平均期望值')
         plt.xticks([i for i in range(len(strategies))], [strategies_cn[s] for s in strategies])
-        img_dir = 'img'
         os.makedirs(img_dir, exist_ok=True)
         plt.savefig(os.path.join(img_dir, 'expected_value_comparison.png'))
         plt.close()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import numpy as np
+from deck import CARD_VALUES
+from strategy_registry import registry, HIT
+
+
+class BatchSimulator:
+    """批次模擬引擎：以 NumPy 陣列同時模擬大量獨立牌堆（適用策略登錄表中不依賴剩餘牌組成的查表策略）"""
+
+    max_total = 32  # 最終點數直方圖長度（最大可能點數為 17 + 10 = 27）
+
+    def __init__(self, num_decks=6, shuffle_ratio=0.4):
+        self.num_decks = num_decks
+        self.total_cards = num_decks * 52
+        self.shuffle_threshold = int(self.total_cards * shuffle_ratio)  # 與 BlackjackSimulator 相同的洗牌規則
+        self._base_shoe = np.array(CARD_VALUES * num_decks, dtype=np.int8)
+
+    def _draw(self, rng, shoes, pos, rows):
+        """替 rows 中的牌堆各抽一張牌（shoes 為攤平的牌堆陣列）
+
+        採用延遲式 Fisher-Yates：從剩餘牌中均勻隨機選一張換到游標位置，
+        因此洗牌只需將游標歸零，不必重排整個牌堆；牌局中途用盡的牌堆與 Deck.draw 相同，立即洗牌。
+        """
+        exhausted = rows[pos[rows] >= self.total_cards]
+        if exhausted.size:
+            pos[exhausted] = 0
+        current = pos[rows]
+        offset = rows * self.total_cards
+        picked = offset + current + (rng.random(rows.size) * (self.total_cards - current)).astype(np.int64)
+        current += offset
+        card = shoes[picked]
+        shoes[picked] = shoes[current]
+        shoes[current] = card
+        pos[rows] += 1
+        return card
+
+    def run_batch(self, strategy_name, num_hands, num_shoes=10000, seed=None, keep_results=False):
+        """每個牌堆各模擬 num_hands 局，共 num_hands * num_shoes 局
+
+        返回字典：histogram（最終點數計數）、bust_rate、average_points、
+        expected_value（與 calculate_expected_value 相同，爆牌計為 21）及
+        keep_results=True 時的 results（形狀 (num_shoes, num_hands) 的 int8 陣列）。
+        """
+        strategy = registry.get(strategy_name)
+        if strategy.needs_composition:
+            raise ValueError(f"批次引擎不支援策略: {strategy_name}")
+        # 查表陣列：hits[總點數 * 2 + 軟牌] 為是否補牌
+        hits = np.frombuffer(strategy.actions, dtype=np.uint8) == HIT
+
+        rng = np.random.default_rng(seed)
+        shoes = np.tile(self._base_shoe, num_shoes)  # 攤平的 (num_shoes, total_cards) 牌堆
+        pos = np.zeros(num_shoes, dtype=np.int64)
+        rows = np.arange(num_shoes)
+        histogram = np.zeros(self.max_total, dtype=np.int64)
+        results = np.empty((num_shoes, num_hands), dtype=np.int8) if keep_results else None
+
+        for hand in range(num_hands):
+            # 剩餘牌數低於洗牌點的牌堆將已用牌放回（游標歸零即等同重新洗牌）
+            pos[(self.total_cards - pos) <= self.shuffle_threshold] = 0
+
+            # 起始兩張牌
+            first = self._draw(rng, shoes, pos, rows)
+            second = self._draw(rng, shoes, pos, rows)
+            total = first.astype(np.int16) + second
+            soft = (first == 11).astype(np.int8) + (second == 11)
+            over = total > 21  # 僅 A+A 會超過 21
+            total[over] -= 10
+            soft[over] -= 1
+
+            # 補牌：每一步只處理尚未停牌的手牌
+            active = np.flatnonzero(hits[total * 2 + (soft > 0)])
+            while active.size:
+                card = self._draw(rng, shoes, pos, active)
+                new_total = total[active] + card
+                new_soft = soft[active] + (card == 11)
+                over = (new_total > 21) & (new_soft > 0)
+                while over.any():  # 軟 21 再補 A 時需降兩張 A
+                    new_total[over] -= 10
+                    new_soft[over] -= 1
+                    over = (new_total > 21) & (new_soft > 0)
+                total[active] = new_total
+                soft[active] = new_soft
+                active = active[hits[new_total * 2 + (new_soft > 0)]]
+
+            histogram += np.bincount(total, minlength=self.max_total)
+            if keep_results:
+                results[:, hand] = total
+
+        hands = num_hands * num_shoes
+        points = np.minimum(np.arange(self.max_total), 21)
+        average_points = float((points * histogram).sum() / hands) if hands else 0.0
+        return {
+            'strategy': strategy_name,
+            'num_hands': hands,
+            'histogram': histogram,
+            'bust_rate': float(histogram[22:].sum() / hands) if hands else 0.0,
+            'average_points': average_points,
+            'expected_value': average_points,
+            'results': results
+        }
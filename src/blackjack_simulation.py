@@ -1,38 +1,117 @@
-from deck import Deck
+from deck import Deck, RANKS, SUITS, RANK_VALUES, CARD_RANKS, CARD_VALUES
 from collections import defaultdict
-import numpy as np
+import os
+import random
+import time
+from decision_cache import DecisionCache
+from streaming_stats import StreamingStats
+from hand_log import HandLog, HandRecord, format_hand
+from instrumentation import Instrumentation, TimedDeck
+from result_store import ResultStore
+from run_catalog import RunCatalog
+from strategy_registry import registry, HIT, RULE
+from checkpoint import (save_checkpoint, load_checkpoint, encode_deck_state, decode_deck_state,
+                        decode_results, results_path, append_results, load_results)
 
 class BlackjackSimulator:
-    def __init__(self, num_decks=6):
-        self.num_decks = num_decks
-        self.total_cards = num_decks * 52  # 6 副牌共 312 張
-        self.shuffle_threshold = int(self.total_cards * 0.4)  # 40% 即 124 張
+    # 可由參數掃描調整的策略參數（模擬器屬性）
+    tunable_params = ('adaptive_bust_limit',)
+
+    def __init__(self, num_decks=6, decision_cache_size=0, keep_results=True, log_capacity=None,
+                 result_store=None, shuffle_ratio=0.4, catalog=None):
+        """keep_results=False 時不保留每局結果列表，僅維護串流統計（記憶體 O(1)）；
+        log_capacity 為每位玩家保留的牌局記錄數上限（None 不限，0 不記錄）；
+        result_store 為 ResultStore 時每局結果另以欄式檔案保存；
+        shuffle_ratio 為洗牌點：剩餘牌數不超過總牌數的此比例時洗牌；
+        catalog 為 RunCatalog 時，參數完全相同的已完成執行直接由目錄取得統計；目錄只保存串流統計，
+        因此僅在 keep_results=False、log_capacity=0、未使用 result_store 且未啟用效能監測時生效"""
+        self.configure_shoe(num_decks, shuffle_ratio)
+        self.adaptive_bust_limit = 0.4  # 自適應策略：爆牌概率低於此值時補牌
         self.results = defaultdict(lambda: defaultdict(list))  # 結構: {strategy: {player_id: [results]}}
         self.expected_values = defaultdict(dict)  # 結構: {strategy: {player_id: ev}}
-        self.hand_logs = defaultdict(lambda: defaultdict(list))  # 結構: {strategy: {player_id: [logs]}}
+        self.log_capacity = log_capacity
+        self.hand_logs = defaultdict(lambda: defaultdict(self.new_hand_log))  # 結構: {strategy: {player_id: HandLog}}
+        self.keep_results = keep_results
+        self.stats = defaultdict(dict)  # 結構: {strategy: {player_id: StreamingStats}}
+        self.strategy_stats = {}  # 結構: {strategy: StreamingStats}（所有玩家合計）
+        self.convergence = {}  # 目標精度模式的狀態 {strategy: {'hands', 'bust_halfwidth', 'ev_halfwidth', 'converged'}}
+        self.shoe_stats = {}  # 共同隨機數模式的逐牌靴統計 {strategy: {player_id: [[局數, 爆牌數, 點數和], ...]}}
+        self.decision_cache = DecisionCache(decision_cache_size)  # 高級自適應策略的決策快取（預設停用）
+        self._hit_weights = {}  # {(total, soft): 各牌值補牌後的點數增減}
+        self._constant_decisions = {}  # {(total, soft): 與剩餘牌組成無關的決策，None 表示需依組成判斷}
+        self._rules = {}  # {strategy: 綁定本模擬器的組成規則}
+        self.checkpoint_rows = {}  # {player_id: 檢查點結果檔中已保存的局數}
+        self.instrumentation = None  # 效能監測（None 表示停用，熱點路徑不做任何計時）
+        self.stop_requested = False
+        self.result_store = result_store
+        self.result_writers = {}  # 模擬進行中的 {(strategy, player_id): ColumnWriter}
+        self.catalog = catalog
+        self.catalog_keys = {}  # {strategy: 最近一次執行的參數雜湊}，供記錄產出檔案位置
+        self.cache_hits = set()  # 最近一次由目錄取得結果的策略
+    
+    def configure_shoe(self, num_decks, shuffle_ratio=0.4):
+        """設定牌堆副數與洗牌點（之後建立的牌堆生效）"""
+        self.num_decks = num_decks
+        self.shuffle_ratio = shuffle_ratio
+        self.total_cards = num_decks * 52  # 6 副牌共 312 張
+        self.shuffle_threshold = int(self.total_cards * shuffle_ratio)  # 預設 40% 即 124 張
+    
+    def strategy_params(self):
+        """目前的可調策略參數 {名稱: 值}"""
+        return {name: getattr(self, name) for name in self.tunable_params}
+    
+    def set_strategy_params(self, params):
+        """套用可調策略參數；未知的參數名稱拋出 ValueError"""
+        for name, value in params.items():
+            if name not in self.tunable_params:
+                raise ValueError(f"未知的策略參數: {name}")
+            setattr(self, name, value)
+    
+    def enable_instrumentation(self):
+        """啟用效能監測，返回 Instrumentation 物件（已啟用時沿用原物件）"""
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation()
+        return self.instrumentation
+    
+    def disable_instrumentation(self):
+        self.instrumentation = None
         
     def get_card_value(self, card):
-        """計算單張牌的點數，移除花色"""
-        rank = card[:-1] if card[-1] in ['♠', '♥', '♦', '♣'] else card
-        if rank in ['J', 'Q', 'K']:
-            return 10
-        if rank == 'A':
-            return 11
-        return int(rank)
+        """計算單張牌的點數；card 可為牌碼或字串（如 '10♥'、'K'）"""
+        if isinstance(card, int):
+            return CARD_VALUES[card]
+        rank = card[:-1] if card[-1] in SUITS else card
+        return RANK_VALUES[RANKS.index(rank)]
     
     def calculate_total(self, hand):
-        """計算手牌總點數"""
+        """計算手牌總點數（hand 為牌碼列表）"""
+        return self.hand_state(hand)[0]
+    
+    def hand_state(self, hand):
+        """返回 (總點數, 是否軟牌)；軟牌表示仍有 A 以 11 點計"""
         total = 0
         aces = 0
         for card in hand:
-            if card[:-1] == 'A':  # 檢查牌值是否為 A（忽略花色）
+            if CARD_RANKS[card] == 0:  # 牌值索引 0 為 A
                 aces += 1
-            total += self.get_card_value(card)
+            total += CARD_VALUES[card]
         
         while total > 21 and aces:
             total -= 10
             aces -= 1
-        return total
+        return total, aces > 0
+    
+    def format_hand(self, hand):
+        """將牌碼列表格式化為顯示用字串，例如 ['10♠', '5♦']"""
+        return format_hand(hand)
+    
+    def new_hand_log(self):
+        """建立依 log_capacity 設定容量的牌局記錄緩衝區"""
+        return HandLog(self.log_capacity)
+    
+    def format_log(self, record):
+        """將牌局記錄轉為文字 Log（僅在顯示或匯出時呼叫）"""
+        return record.format(self.shuffle_threshold, self.shuffle_ratio)
     
     def basic_strategy(self, hand):
         """基本策略：小於 17 點補牌，17 點以上停牌"""
@@ -48,106 +127,674 @@ class BlackjackSimulator:
     
     def adaptive_strategy(self, hand, deck):
         """自適應策略：基於爆牌概率"""
-        total = self.calculate_total(hand)
+        total, soft = self.hand_state(hand)
+        return self.adaptive_decision(total, soft, deck.rank_counts, deck.remaining_count())
+    
+    def advanced_adaptive_strategy(self, hand, deck):
+        """高級自適應策略：基於期望值"""
+        total, soft = self.hand_state(hand)
+        return self.advanced_decision(total, soft, deck.rank_counts, deck.remaining_count(), deck.composition_key)
+    
+    def adaptive_decision(self, total, soft, rank_counts, total_cards, composition_key=None):
+        """自適應策略的決策：以總點數與剩餘牌計數（索引對應 RANKS）表示（不使用組成編碼）"""
         if total < 12:
             return True
         
         if 12 <= total <= 16:
-            remaining = deck.get_remaining_cards()
-            total_cards = sum(remaining.values())
             if total_cards == 0:
                 return False
                 
             bust_cards = 0
-            for card, count in remaining.items():
-                if self.get_card_value(card) + total > 21:
+            for rank, count in enumerate(rank_counts):
+                if RANK_VALUES[rank] + total > 21:
                     bust_cards += count
             bust_prob = bust_cards / total_cards
-            return bust_prob < 0.4
+            return bust_prob < self.adaptive_bust_limit
         return False
     
-    def advanced_adaptive_strategy(self, hand, deck):
-        """高級自適應策略：基於期望值"""
-        total = self.calculate_total(hand)
+    def adaptive_deck_decision(self, total, soft, deck):
+        """與 adaptive_decision 相同的決策，爆牌張數直接由牌堆的點數累計表查得"""
+        if total < 12:
+            return True
+        
+        if 12 <= total <= 16:
+            total_cards = deck.remaining_count()
+            if total_cards == 0:
+                return False
+            return deck.bust_count(total) / total_cards < self.adaptive_bust_limit
+        return False
+    
+    def advanced_decision(self, total, soft, rank_counts, total_cards, composition_key=None):
+        """高級自適應策略的決策；提供 composition_key 且啟用 decision_cache 時，依組成的狀態使用決策快取
+
+        與組成無關的狀態由 constant_decision 直接判斷。依組成的狀態（僅軟牌）以組成編碼為鍵幾乎不會重複
+        （6 副牌 10 萬局的命中率約 1.6%），且查表成本高於直接計算 13 項加權和，因此快取預設停用，僅供量測。
+        """
         if total < 12:
             return True
             
         if 12 <= total <= 18:
-            remaining = deck.get_remaining_cards()
-            total_cards = sum(remaining.values())
             if total_cards == 0:
                 return False
-                
-            stand_value = min(total, 21)
-            hit_value = 0
-            for card, count in remaining.items():
-                temp_hand = hand + [card]
-                temp_total = self.calculate_total(temp_hand)
-                hit_value += (count / total_cards) * min(temp_total, 21)
+            # 所有牌的權重同號時決策與剩餘牌組成無關（所有硬牌狀態皆是），直接返回，不經過快取
+            constant = self.constant_decision(total, soft)
+            if constant is not None:
+                return constant
+            if composition_key is None or self.decision_cache.maxsize <= 0:
+                return self.expected_value_decision(total, soft, rank_counts)
             
-            return hit_value > stand_value
+            key = (total, soft, composition_key)
+            decision = self.decision_cache.get(key)
+            if decision is None:
+                decision = self.expected_value_decision(total, soft, rank_counts)
+                self.decision_cache.put(key, decision)
+            return decision
         return False
     
+    def get_decision(self, strategy_name):
+        """依名稱取得以狀態表示的決策函式 decide(total, soft, rank_counts, total_cards)"""
+        return registry.get(strategy_name).decision(self)
+    
+    def hit_weights(self, total, soft):
+        """補一張各牌值後的點數（爆牌計為 21）減去停牌點數，依 (總點數, 軟牌) 快取"""
+        weights = self._hit_weights.get((total, soft))
+        if weights is None:
+            weights = []
+            for rank in range(len(RANKS)):
+                new_total = total + RANK_VALUES[rank]
+                aces = soft + (rank == 0)
+                while new_total > 21 and aces:
+                    new_total -= 10
+                    aces -= 1
+                weights.append(min(new_total, 21) - min(total, 21))
+            weights = tuple(weights)
+            self._hit_weights[(total, soft)] = weights
+        return weights
+    
+    def constant_decision(self, total, soft):
+        """權重全為正時必定補牌（True）、全不為正時必定停牌（False），否則返回 None（依 (總點數, 軟牌) 快取）"""
+        key = (total, soft)
+        if key not in self._constant_decisions:
+            weights = self.hit_weights(total, soft)
+            self._constant_decisions[key] = True if min(weights) > 0 else False if max(weights) <= 0 else None
+        return self._constant_decisions[key]
+    
+    def expected_value_decision(self, total, soft, rank_counts):
+        """補牌後期望點數是否高於停牌點數（以整數加權和比較，避免浮點誤差）"""
+        weights = self.hit_weights(total, soft)
+        return sum(count * weight for count, weight in zip(rank_counts, weights)) > 0
+    
     def simulate_hand(self, strategy, strategy_name, player_id, deck, round_num):
-        """模擬莊家一手牌，並記錄過程"""
+        """模擬莊家一手牌，並以緊湊記錄保存過程；strategy 為策略登錄表中已編譯的策略"""
+        if self.instrumentation is not None:
+            return self.simulate_hand_instrumented(strategy, strategy_name, player_id, deck, round_num)
+        
         # 檢查剩餘牌數，低於 40% 時洗牌
-        remaining_cards = len(deck.cards)
+        remaining_cards = deck.remaining_count()
+        if remaining_cards <= self.shuffle_threshold:
+            deck.shuffle()
+            shuffled_at = remaining_cards
+        else:
+            shuffled_at = -1
+        
+        # 起始兩張牌；總點數與以 11 點計的 A 張數逐張更新，不重算整手牌
+        first, second = deck.draw(), deck.draw()
+        hand = [first, second]
+        total = CARD_VALUES[first] + CARD_VALUES[second]
+        aces = (CARD_RANKS[first] == 0) + (CARD_RANKS[second] == 0)
+        if total > 21:
+            total -= 10
+            aces -= 1
+        
+        # 補牌邏輯：查表決定，只有需要剩餘牌組成的狀態才呼叫規則
+        actions = strategy.actions
+        while True:
+            action = actions[total * 2 + (aces > 0)]
+            if action == RULE:
+                if not self.strategy_rule(strategy)(total, aces > 0, deck):
+                    break
+            elif action != HIT:
+                break
+            card = deck.draw()
+            hand.append(card)
+            total += CARD_VALUES[card]
+            if CARD_RANKS[card] == 0:
+                aces += 1
+            # 軟 21 再補 A 時需降兩張 A（32 -> 22 -> 12）
+            while total > 21 and aces:
+                total -= 10
+                aces -= 1
+        
+        hand_log = self.hand_logs[strategy_name][player_id]
+        if hand_log.capacity != 0:
+            hand_log.append(HandRecord(round_num, bytes(hand), shuffled_at, total))
+        if self.result_writers:
+            self.result_writers[strategy_name, player_id].append(
+                total, len(hand), shuffled_at >= 0, player_id, round_num
+            )
+        return total, deck.rank_counts
+    
+    def simulate_hand_instrumented(self, strategy, strategy_name, player_id, deck, round_num):
+        """與 simulate_hand 相同的流程，另記錄各階段耗時與計數"""
+        instr = self.instrumentation
+        clock = instr.clock
+        instr.count('hands')
+        
+        remaining_cards = deck.remaining_count()
         if remaining_cards <= self.shuffle_threshold:
+            start = clock()
             deck.shuffle()
-            log = [f"牌堆剩餘 {remaining_cards} 張，低於 40%（{self.shuffle_threshold} 張），已將用過的牌放回並洗牌"]
+            instr.add('shuffle', clock() - start)
+            instr.count('shuffles')
+            shuffled_at = remaining_cards
         else:
-            log = []
+            shuffled_at = -1
         
-        # 起始兩張牌
+        start = clock()
         hand = [deck.draw(), deck.draw()]
-        log.append(f"初始手牌: {hand}, 點數: {self.calculate_total(hand)}")
+        instr.add('draw', clock() - start, 2)
         
-        # 補牌邏輯
-        while strategy(hand, deck) if strategy_name in ['adaptive', 'advanced'] else strategy(hand):
-            new_card = deck.draw()
-            hand.append(new_card)
-            log.append(f"補牌: {new_card}, 當前手牌: {hand}, 點數: {self.calculate_total(hand)}")
+        actions = strategy.actions
+        timed_deck = TimedDeck(deck, instr)
+        total, soft = self.hand_state(hand)
+        while True:
+            start = clock()
+            action = actions[total * 2 + soft]
+            if action == RULE:
+                hit = self.strategy_rule(strategy)(total, soft, timed_deck)
+            else:
+                hit = action == HIT
+            instr.add('decision', clock() - start)
+            instr.count('decisions')
+            if not hit:
+                break
+            start = clock()
+            hand.append(deck.draw())
+            instr.add('draw', clock() - start)
+            instr.count('hits')
+            total, soft = self.hand_state(hand)
         
-        final_total = self.calculate_total(hand)
-        log.append(f"最終結果: 點數 {final_total}{' (爆牌)' if final_total > 21 else ''}")
-        self.hand_logs[strategy_name][player_id].append("\n".join(log))
-        return final_total, deck.get_remaining_cards()
+        hand_log = self.hand_logs[strategy_name][player_id]
+        if hand_log.capacity != 0:
+            start = clock()
+            hand_log.append(HandRecord(round_num, bytes(hand), shuffled_at, total))
+            instr.add('log', clock() - start)
+        if self.result_writers:
+            self.result_writers[strategy_name, player_id].append(
+                total, len(hand), shuffled_at >= 0, player_id, round_num
+            )
+        return total, timed_deck.rank_counts
+    
+    def strategy_rule(self, strategy):
+        """取得（並快取）策略綁定本模擬器、以牌堆查詢的組成規則 decide(total, soft, deck)"""
+        rule = self._rules.get(strategy.name)
+        if rule is None:
+            rule = self._rules[strategy.name] = strategy.bind_deck(self)
+        return rule
     
     def calculate_expected_value(self, strategy_name, player_id, results):
         """計算策略的期望值"""
         valid_results = [min(r, 21) for r in results]
-        return np.mean(valid_results)
-    
-    def run_simulation(self, strategy_name, num_hands, num_players, update_callback=None):
-        """運行多玩家輪流模擬"""
-        strategies = {
-            'basic': self.basic_strategy,
-            'conservative': self.conservative_strategy,
-            'aggressive': self.aggressive_strategy,
-            'adaptive': self.adaptive_strategy,
-            'advanced': self.advanced_adaptive_strategy
-        }
-        
-        decks = {pid: Deck(self.num_decks) for pid in range(1, num_players + 1)}
+        return sum(valid_results) / len(valid_results) if valid_results else 0.0
+    
+    def get_strategy(self, strategy_name):
+        """依名稱取得策略登錄表中已編譯的策略（未知名稱拋出 ValueError）"""
+        return registry.get(strategy_name)
+    
+    @staticmethod
+    def deck_seed(seed, strategy_name, player_id):
+        """由主種子推導每個 (策略, 玩家) 牌堆的獨立種子；seed 為 None 時不固定"""
+        if seed is None:
+            return None
+        return f"{seed}:{strategy_name}:{player_id}"
+    
+    def reset_strategy(self, strategy_name, num_players):
+        """清空某策略的結果、Log 與統計"""
         self.results[strategy_name] = {pid: [] for pid in range(1, num_players + 1)}
-        self.hand_logs[strategy_name] = {pid: [] for pid in range(1, num_players + 1)}
+        self.hand_logs[strategy_name] = {pid: self.new_hand_log() for pid in range(1, num_players + 1)}
+        self.stats[strategy_name] = {pid: StreamingStats() for pid in range(1, num_players + 1)}
+        self.strategy_stats[strategy_name] = StreamingStats()
+        self.shoe_stats[strategy_name] = {pid: [] for pid in range(1, num_players + 1)}
+        self.convergence.pop(strategy_name, None)
+        self.cache_hits.discard(strategy_name)
+    
+    def record_result(self, strategy_name, player_id, result):
+        """記錄一局結果：更新串流統計，keep_results 時附加到結果列表"""
+        self.stats[strategy_name][player_id].add(result)
+        self.strategy_stats[strategy_name].add(result)
+        if self.keep_results:
+            self.results[strategy_name][player_id].append(result)
+    
+    def run_simulation(self, strategy_name, num_hands, num_players, update_callback=None, seed=None, workers=1,
+                       callback_interval=0, checkpoint_path=None, checkpoint_every=10000, common_random_numbers=False,
+                       target_bust_halfwidth=None, target_ev_halfwidth=None, check_every=1000):
+        """運行多玩家輪流模擬；workers > 1 時將玩家分派到多個程序平行模擬
+
+        update_callback(strategy_name, stats, logs, remaining_cards, expected_card_value) 的 stats 為
+        該策略所有玩家合計的 StreamingStats 快照，expected_card_value 為牌堆索引提供的下一張牌期望點數；callback_interval（秒）大於 0 時
+        兩次回呼至少相隔該時間（被略過的局不建立快照），模擬結束時必定再回呼一次。
+        指定 checkpoint_path 時每 checkpoint_every 局及停止時寫入檢查點（僅單程序模式）。
+        common_random_numbers=True 時牌堆種子與策略無關（各策略面對相同的牌靴序列），
+        並記錄逐牌靴統計供 paired_statistics() 配對比較。
+        指定 target_bust_halfwidth / target_ev_halfwidth（95% 信賴區間半寬）時為目標精度模式：
+        每 check_every 局檢查一次，所有目標達成即停止，num_hands 為每位玩家的局數上限（僅單程序模式）。
+        workers > 1 時檢查點、共同隨機數與目標精度皆不支援，指定時拋出 ValueError；
+        平行模式每完成一位玩家回呼一次，callback_interval 不適用。
+        設定執行目錄時，固定 seed 的執行會查詢並寫入目錄（條件見建構子說明）。
+        返回 True 表示全部完成，False 表示因 request_stop() 中途停止。
+        """
+        if workers > 1:
+            unsupported = [name for name, used in (
+                ('checkpoint_path', bool(checkpoint_path)),
+                ('common_random_numbers', common_random_numbers),
+                ('target_bust_halfwidth', target_bust_halfwidth is not None),
+                ('target_ev_halfwidth', target_ev_halfwidth is not None)
+            ) if used]
+            if unsupported:
+                raise ValueError(f"平行模式（workers > 1）不支援: {', '.join(unsupported)}")
+            return self.run_parallel([strategy_name], num_hands, num_players, update_callback, seed, workers)
+        
+        run = {'strategy': strategy_name, 'num_hands': num_hands, 'num_players': num_players, 'seed': seed,
+               'common_random_numbers': common_random_numbers}
+        if target_bust_halfwidth is not None or target_ev_halfwidth is not None:
+            run['targets'] = {'bust_halfwidth': target_bust_halfwidth, 'ev_halfwidth': target_ev_halfwidth,
+                              'check_every': check_every}
+        if self.serve_from_catalog(run, update_callback):
+            return True
+        
+        seed_key = 'common' if common_random_numbers else strategy_name
+        decks = {pid: Deck(self.num_decks, seed=self.deck_seed(seed, seed_key, pid))
+                 for pid in range(1, num_players + 1)}
+        self.reset_strategy(strategy_name, num_players)
+        if self.result_store is not None:
+            self.result_store.clear(strategy_name)
+            self.open_result_writers(strategy_name, num_players, 0)
+        return self.run_rounds(run, decks, 1, update_callback, callback_interval, checkpoint_path, checkpoint_every)
+    
+    def resume_simulation(self, checkpoint_path, update_callback=None, callback_interval=0, checkpoint_every=10000):
+        """由檢查點還原牌堆、統計與局數後繼續模擬，結果與未中斷的執行完全相同
+        
+        檢查點不含牌局記錄，續跑後 Log 只包含續跑之後的局（累計索引仍與局數對應）。返回值同 run_simulation。
+        """
+        state = load_checkpoint(checkpoint_path)
+        self.configure_shoe(state['num_decks'], state.get('shuffle_ratio', 0.4))
+        self.set_strategy_params(state.get('params', {}))
+        run = state['run']
+        strategy_name = run['strategy']
+        self.reset_strategy(strategy_name, run['num_players'])
+        for hand_log in self.hand_logs[strategy_name].values():
+            hand_log.start_at(state['round'])
+        decks = {}
+        for pid, player in state['players'].items():
+            pid = int(pid)
+            decks[pid] = Deck.from_state(decode_deck_state(player['deck']))
+            self.stats[strategy_name][pid] = StreamingStats.from_dict(player['stats'])
+            if 'results_rows' in player:
+                self.results[strategy_name][pid] = load_results(results_path(checkpoint_path, pid),
+                                                                player['results_rows'])
+            elif 'results' in player:  # 舊版檢查點將結果直接嵌入 JSON
+                self.results[strategy_name][pid] = decode_results(player['results'])
+            if 'shoes' in player:
+                self.shoe_stats[strategy_name][pid] = player['shoes']
+        self.strategy_stats[strategy_name] = StreamingStats.from_dict(state['strategy_stats'])
+        if self.result_store is not None:
+            self.open_result_writers(strategy_name, run['num_players'], state['round'])
+        return self.run_rounds(run, decks, state['round'] + 1, update_callback, callback_interval,
+                               checkpoint_path, checkpoint_every)
+    
+    def open_result_writers(self, strategy_name, num_players, start_row):
+        """為每位玩家開啟欄式結果寫入器（start_row 之後的既有資料會被截斷）"""
+        self.result_writers = {
+            (strategy_name, pid): self.result_store.writer(strategy_name, pid, start_row)
+            for pid in range(1, num_players + 1)
+        }
+    
+    def flush_result_writers(self):
+        for writer in self.result_writers.values():
+            writer.flush()
+    
+    def request_stop(self):
+        """要求進行中的模擬在本局結束後停止（可由其他執行緒呼叫）
+
+        停止要求由下一個檢查到它的執行消耗：進行中的執行停止並清除旗標；
+        在兩次執行之間提出時，下一次執行在第一局前即停止，不會因開始新執行而遺失。
+        """
+        self.stop_requested = True
+    
+    def write_checkpoint(self, checkpoint_path, run, decks, round_num):
+        """原子寫入第 round_num 局結束時的檢查點
+
+        keep_results 時每局結果不嵌入 JSON，而是將上次檢查點之後新增的局附加到各玩家的結果檔，
+        JSON 只記錄有效局數，因此每次寫入的成本與已模擬的總局數無關。
+        """
+        self.flush_result_writers()
+        if self.keep_results:
+            for pid in decks:
+                append_results(results_path(checkpoint_path, pid), self.results[run['strategy']][pid],
+                                self.checkpoint_rows.get(pid, 0))
+                self.checkpoint_rows[pid] = round_num
+        save_checkpoint(checkpoint_path, self.checkpoint_state(run, decks, round_num))
+    
+    def checkpoint_state(self, run, decks, round_num):
+        """建立第 round_num 局結束時的檢查點內容（每局結果由 write_checkpoint 另行附加）"""
+        strategy_name = run['strategy']
+        players = {}
+        for pid, deck in decks.items():
+            player = {
+                'deck': encode_deck_state(deck.get_state()),
+                'stats': self.stats[strategy_name][pid].to_dict()
+            }
+            if self.keep_results:
+                player['results_rows'] = round_num
+            if run.get('common_random_numbers'):
+                player['shoes'] = self.shoe_stats[strategy_name][pid]
+            players[str(pid)] = player
+        return {
+            'run': run,
+            'num_decks': self.num_decks,
+            'shuffle_ratio': self.shuffle_ratio,
+            'params': self.strategy_params(),
+            'round': round_num,
+            'players': players,
+            'strategy_stats': self.strategy_stats[strategy_name].to_dict()
+        }
+    
+    def run_rounds(self, run, decks, start_round, update_callback=None, callback_interval=0, checkpoint_path=None,
+                   checkpoint_every=10000):
+        """從 start_round 開始逐局輪流模擬各玩家，直到 run['num_hands'] 局或收到停止要求"""
+        strategy_name = run['strategy']
+        num_hands = run['num_hands']
+        num_players = run['num_players']
+        strategy = self.get_strategy(strategy_name)
+        instr = self.instrumentation
+        if instr is not None:
+            instr.begin_run(strategy_name)
+        clock = time.perf_counter
+        started = clock()
+        next_callback = 0.0
+        remaining_cards = None
+        deck = None
+        completed = True
+        shoe_stats = self.shoe_stats[strategy_name] if run.get('common_random_numbers') else None
+        targets = run.get('targets')
+        self.checkpoint_rows = dict.fromkeys(decks, start_round - 1)  # 各玩家結果檔中已保存的局數
         
-        for round_num in range(1, num_hands + 1):
+        for round_num in range(start_round, num_hands + 1):
+            if self.stop_requested:
+                self.stop_requested = False
+                completed = False
+                if checkpoint_path:
+                    self.write_checkpoint(checkpoint_path, run, decks, round_num - 1)
+                break
             for player_id in range(1, num_players + 1):
+                deck = decks[player_id]
                 result, remaining_cards = self.simulate_hand(
-                    strategies[strategy_name], 
+                    strategy, 
                     strategy_name, 
                     player_id, 
-                    decks[player_id], 
+                    deck, 
                     round_num
                 )
-                self.results[strategy_name][player_id].append(result)
+                self.record_result(strategy_name, player_id, result)
+                if shoe_stats is not None:
+                    self.record_shoe(shoe_stats[player_id], deck.shuffles, result)
+                if update_callback and (not callback_interval or clock() >= next_callback):
+                    self.notify(update_callback, strategy_name, remaining_cards, deck.expected_card_value())
+                    next_callback = clock() + callback_interval if callback_interval else 0.0
+            if targets is not None and round_num % targets['check_every'] == 0 and self.check_convergence(
+                    strategy_name, targets):
+                break
+            if checkpoint_path and round_num % checkpoint_every == 0 and round_num < num_hands:
+                self.write_checkpoint(checkpoint_path, run, decks, round_num)
+        
+        if update_callback and callback_interval and remaining_cards is not None:
+            self.notify(update_callback, strategy_name, remaining_cards, deck.expected_card_value())
+        if targets is not None:
+            self.check_convergence(strategy_name, targets)
+        if instr is not None:
+            instr.end_run()
+        self.flush_result_writers()
+        self.result_writers = {}
+        if completed and checkpoint_path:
+            # 已完成的執行不再需要檢查點與結果檔
+            for path in [checkpoint_path] + [results_path(checkpoint_path, pid) for pid in decks]:
+                if os.path.exists(path):
+                    os.remove(path)
+        self.update_expected_values(strategy_name)
+        if completed:
+            self.store_in_catalog(run, clock() - started, remaining_cards,
+                                  deck.expected_card_value() if deck is not None else None)
+        return completed
+    
+    def catalog_params(self, run):
+        """決定執行結果的全部參數：執行設定、牌靴規則、可調策略參數與策略查表內容"""
+        strategy = self.get_strategy(run['strategy'])
+        rule = strategy.rule if strategy.rule is None or isinstance(strategy.rule, str) else \
+            getattr(strategy.rule, '__qualname__', repr(strategy.rule))
+        return dict(run, num_decks=self.num_decks, shuffle_ratio=self.shuffle_ratio, params=self.strategy_params(),
+                    actions=strategy.actions.hex(), rule=rule)
+    
+    def catalog_key(self, run):
+        """可使用目錄時返回參數雜湊；未固定種子或需要每局結果、牌局記錄、欄式儲存、效能監測時返回 None"""
+        if (self.catalog is None or run['seed'] is None or self.keep_results or self.log_capacity != 0
+                or self.result_store is not None or self.instrumentation is not None):
+            return None
+        return RunCatalog.param_hash(self.catalog_params(run))
+    
+    def serve_from_catalog(self, run, update_callback=None):
+        """目錄中有相同參數的紀錄時還原統計並回呼一次，返回是否命中"""
+        key = self.catalog_key(run)
+        if key is None:
+            return False
+        payload = self.catalog.lookup(key)
+        if payload is None:
+            return False
+        strategy_name = run['strategy']
+        self.reset_strategy(strategy_name, run['num_players'])
+        for pid, stats in payload['players'].items():
+            self.stats[strategy_name][int(pid)] = StreamingStats.from_dict(stats)
+        self.strategy_stats[strategy_name] = StreamingStats.from_dict(payload['strategy_stats'])
+        if 'shoes' in payload:
+            self.shoe_stats[strategy_name] = {int(pid): shoes for pid, shoes in payload['shoes'].items()}
+        if 'convergence' in payload:
+            self.convergence[strategy_name] = payload['convergence']
+        self.update_expected_values(strategy_name)
+        self.catalog_keys[strategy_name] = key
+        self.cache_hits.add(strategy_name)
+        if update_callback:
+            remaining_cards = payload.get('remaining_cards')
+            self.notify(update_callback, strategy_name, tuple(remaining_cards) if remaining_cards else None,
+                        payload.get('expected_card_value'))
+        return True
+    
+    def store_in_catalog(self, run, elapsed, remaining_cards=None, expected_card_value=None):
+        """將已完成執行的統計寫入目錄"""
+        key = self.catalog_key(run)
+        if key is None:
+            return
+        strategy_name = run['strategy']
+        payload = {
+            'players': {str(pid): stats.to_dict() for pid, stats in self.stats[strategy_name].items()},
+            'strategy_stats': self.strategy_stats[strategy_name].to_dict(),
+            'remaining_cards': list(remaining_cards) if remaining_cards else None,
+            'expected_card_value': expected_card_value
+        }
+        if run.get('common_random_numbers'):
+            payload['shoes'] = {str(pid): shoes for pid, shoes in self.shoe_stats[strategy_name].items()}
+        if strategy_name in self.convergence:
+            payload['convergence'] = self.convergence[strategy_name]
+        self.catalog.store(key, strategy_name, self.catalog_params(run), payload, elapsed)
+        self.catalog_keys[strategy_name] = key
+    
+    def check_convergence(self, strategy_name, targets):
+        """以所有玩家合計的統計計算 95% 信賴區間半寬，記錄於 convergence 並返回是否已達所有目標"""
+        stats = self.strategy_stats[strategy_name]
+        bust_halfwidth, ev_halfwidth = stats.halfwidths()
+        converged = all(
+            target is None or halfwidth <= target
+            for target, halfwidth in ((targets['bust_halfwidth'], bust_halfwidth),
+                                      (targets['ev_halfwidth'], ev_halfwidth))
+        )
+        self.convergence[strategy_name] = {
+            'hands': stats.count,
+            'bust_halfwidth': bust_halfwidth,
+            'ev_halfwidth': ev_halfwidth,
+            'converged': converged
+        }
+        return converged
+    
+    def notify(self, update_callback, strategy_name, remaining_cards, expected_card_value=None):
+        """以目前統計快照呼叫 update_callback（啟用效能監測時計入 callback 階段）"""
+        instr = self.instrumentation
+        if instr is not None:
+            start = instr.clock()
+        update_callback(strategy_name, self.strategy_stats[strategy_name].snapshot(),
+                        self.hand_logs[strategy_name], remaining_cards, expected_card_value)
+        if instr is not None:
+            instr.add('callback', instr.clock() - start)
+    
+    @staticmethod
+    def record_shoe(shoes, shoe_index, result):
+        """將一局結果累加到第 shoe_index 個牌靴（由 1 起算）的統計"""
+        while len(shoes) < shoe_index:
+            shoes.append([0, 0, 0])
+        shoe = shoes[shoe_index - 1]
+        shoe[0] += 1
+        if result > 21:
+            shoe[1] += 1
+            shoe[2] += 21
+        else:
+            shoe[2] += result
+    
+    def run_paired(self, strategy_names, num_hands, num_players, update_callback=None, seed=None,
+                   callback_interval=0):
+        """共同隨機數模式：各策略依序在相同的牌靴序列上模擬，返回兩兩配對比較
+        
+        未指定 seed 時隨機選取一個，所有策略共用；此種子無法由使用者重現，因此本次不查詢也不寫入執行目錄。
+        """
+        catalog = self.catalog
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+            self.catalog = None
+        try:
+            for strategy_name in strategy_names:
+                if not self.run_simulation(strategy_name, num_hands, num_players, update_callback, seed,
+                                           callback_interval=callback_interval, common_random_numbers=True):
+                    break
+        finally:
+            self.catalog = catalog
+        return self.paired_statistics(strategy_names)
+    
+    def paired_statistics(self, strategy_names):
+        """以牌靴為配對單位，比較共同隨機數模式下各策略兩兩之間的爆牌率與期望值差異"""
+        from analysis_report import AnalysisReport  # 統計計算需要 numpy，僅在此時載入
+        names = [name for name in strategy_names if any(self.shoe_stats.get(name, {}).values())]
+        return [
+            AnalysisReport.paired_comparison(a, b, self.shoe_stats[a], self.shoe_stats[b])
+            for i, a in enumerate(names) for b in names[i + 1:]
+        ]
+    
+    def run_parallel(self, strategy_names, num_hands, num_players, update_callback=None, seed=None, workers=None):
+        """將每個 (策略, 玩家) 分派到程序池平行模擬，完成後併回 results / stats / expected_values
+
+        每個牌堆的種子與單程序模式相同，因此固定 seed 時兩種模式結果一致。
+        收到 request_stop() 時取消尚未開始的工作並不再併入結果（執行中的工作程序無法中斷，
+        離開前仍會等待其結束），返回 False；全部完成時返回 True。
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed  # 僅平行模式需要
+        
+        runs = {
+            strategy_name: {'strategy': strategy_name, 'num_hands': num_hands, 'num_players': num_players,
+                            'seed': seed, 'common_random_numbers': False}
+            for strategy_name in strategy_names
+        }
+        strategy_names = [name for name in strategy_names if not self.serve_from_catalog(runs[name], update_callback)]
+        started = time.perf_counter()
+        last_cards = {}
+        for strategy_name in strategy_names:
+            self.reset_strategy(strategy_name, num_players)
+            if self.result_store is not None:
+                self.result_store.clear(strategy_name)
+        store_path = self.result_store.path if self.result_store is not None else None
+        instr = self.instrumentation
+        if instr is not None:
+            for strategy_name in strategy_names:
+                instr.begin_run(strategy_name)
+        
+        stopped = False
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _simulate_player, self.num_decks, self.get_strategy(strategy_name), player_id, num_hands,
+                    self.deck_seed(seed, strategy_name, player_id), self.keep_results, self.log_capacity,
+                    instr is not None, store_path, self.shuffle_ratio, self.strategy_params()
+                )
+                for strategy_name in strategy_names
+                for player_id in range(1, num_players + 1)
+            ]
+            for future in as_completed(futures):
+                if self.stop_requested:
+                    self.stop_requested = False
+                    stopped = True
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                strategy_name, player_id, results, stats, logs, remaining_cards, card_value, run = future.result()
+                self.results[strategy_name][player_id] = results
+                self.stats[strategy_name][player_id] = stats
+                self.strategy_stats[strategy_name].merge(stats)
+                self.hand_logs[strategy_name][player_id] = logs
+                if run is not None:
+                    instr.merge_run(strategy_name, run)
+                last_cards[strategy_name] = (remaining_cards, card_value)
                 if update_callback:
-                    all_results = [r for pid in self.results[strategy_name] 
-                                 for r in self.results[strategy_name][pid]]
-                    update_callback(strategy_name, all_results, self.hand_logs[strategy_name], remaining_cards)
-        
-        for player_id in range(1, num_players + 1):
-            self.expected_values[strategy_name][player_id] = self.calculate_expected_value(
-                strategy_name, player_id, self.results[strategy_name][player_id]
-            )
\ No newline at end of file
+                    self.notify(update_callback, strategy_name, remaining_cards, card_value)
+        
+        for strategy_name in strategy_names:
+            self.update_expected_values(strategy_name)
+            if not stopped:
+                self.store_in_catalog(runs[strategy_name], time.perf_counter() - started,
+                                      *last_cards.get(strategy_name, (None, None)))
+        return not stopped
+    
+    def update_expected_values(self, strategy_name):
+        """依串流統計更新每位玩家的期望值"""
+        for player_id, stats in self.stats[strategy_name].items():
+            self.expected_values[strategy_name][player_id] = stats.mean
+
+
+def _simulate_player(num_decks, strategy, player_id, num_hands, deck_seed, keep_results=True,
+                     log_capacity=None, instrument=False, result_store_path=None, shuffle_ratio=0.4, params=None):
+    """工作程序：模擬單一 (策略, 玩家) 的全部牌局（模組層級函式以便程序池序列化）
+
+    strategy 為已編譯的 Strategy 本身而非名稱：以 spawn 啟動的工作程序重新匯入 registry，
+    執行期間才登錄的策略不在其中。
+    """
+    strategy_name = strategy.name
+    simulator = BlackjackSimulator(num_decks, keep_results=keep_results, log_capacity=log_capacity,
+                                   shuffle_ratio=shuffle_ratio)
+    simulator.set_strategy_params(params or {})
+    if result_store_path is not None:
+        simulator.result_writers = {(strategy_name, player_id): ResultStore(result_store_path).writer(strategy_name, player_id)}
+    if instrument:
+        simulator.enable_instrumentation().begin_run(strategy_name)
+    simulator.reset_strategy(strategy_name, player_id)
+    deck = Deck(num_decks, seed=deck_seed)
+    remaining_cards = deck.rank_counts
+    for round_num in range(1, num_hands + 1):
+        result, remaining_cards = simulator.simulate_hand(strategy, strategy_name, player_id, deck, round_num)
+        simulator.record_result(strategy_name, player_id, result)
+    simulator.flush_result_writers()
+    run = None
+    if instrument:
+        simulator.instrumentation.end_run()
+        run = simulator.instrumentation.current
+    return (
+        strategy_name, player_id,
+        simulator.results[strategy_name][player_id],
+        simulator.stats[strategy_name][player_id],
+        simulator.hand_logs[strategy_name][player_id],
+        remaining_cards,
+        deck.expected_card_value(),
+        run
+    )
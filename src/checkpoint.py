@@ -0,0 +1,82 @@
+import base64
+import json
+import os
+from array import array
+
+
+def encode_deck_state(state):
+    """將 Deck.get_state() 轉為 JSON 可表示的形式"""
+    version, internal, gauss_next = state['rng']
+    return {
+        'num_decks': state['num_decks'],
+        'buffer': base64.b64encode(state['buffer']).decode('ascii'),
+        'pos': state['pos'],
+        'shuffles': state['shuffles'],
+        'rng': [version, list(internal), gauss_next]
+    }
+
+
+def decode_deck_state(data):
+    version, internal, gauss_next = data['rng']
+    return {
+        'num_decks': data['num_decks'],
+        'buffer': base64.b64decode(data['buffer']),
+        'pos': data['pos'],
+        'shuffles': data.get('shuffles', 0),
+        'rng': (version, tuple(internal), gauss_next)
+    }
+
+
+def encode_results(results):
+    """每局點數以 1 位元組編碼（點數不超過 127）"""
+    return base64.b64encode(array('b', results).tobytes()).decode('ascii')
+
+
+def decode_results(data):
+    return array('b', base64.b64decode(data)).tolist()
+
+
+def results_path(checkpoint_path, player_id):
+    """檢查點旁保存某玩家每局結果的附加檔（每局 1 位元組）"""
+    return f"{checkpoint_path}.player_{player_id}.results"
+
+
+def append_results(path, results, start):
+    """將 results[start:] 附加到 path：先截斷到 start 局，捨棄上次檢查點之後未被採用的資料
+
+    每次只寫入兩次檢查點之間新增的局，成本與總局數無關。
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'ab') as f:
+        f.truncate(start)
+        array('b', results[start:]).tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_results(path, rows):
+    """讀回附加檔的前 rows 局"""
+    results = array('b')
+    with open(path, 'rb') as f:
+        results.fromfile(f, rows)
+    return results.tolist()
+
+
+def save_checkpoint(path, state):
+    """原子寫入檢查點：先寫入暫存檔並同步到磁碟，再以 os.replace 取代舊檔"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,349 @@
+"""無圖形介面的批次模擬入口（不載入 tkinter、ttkbootstrap 或 PIL）
+
+範例：python cli.py --strategies basic advanced --hands 10000 --players 4 --seed 1 --workers 4
+"""
+import argparse
+import csv
+import json
+import os
+import time
+
+from blackjack_simulation import BlackjackSimulator
+from analysis_report import AnalysisReport
+from result_store import ResultStore
+from run_catalog import RunCatalog
+from strategy_registry import registry
+
+STRATEGIES = registry.names()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="21點莊家策略批次模擬（無圖形介面）")
+    parser.add_argument('--strategies', nargs='+', choices=STRATEGIES, default=STRATEGIES,
+                        help="要模擬的策略（預設全部）")
+    parser.add_argument('--hands', type=int, default=1000, help="每位玩家的模擬局數")
+    parser.add_argument('--players', type=int, default=1, help="模擬人數")
+    parser.add_argument('--decks', type=int, default=6, help="牌堆副數")
+    parser.add_argument('--shuffle-ratio', type=float, default=0.4, help="洗牌點：剩餘牌數不超過總牌數的此比例時洗牌")
+    parser.add_argument('--seed', type=int, default=None, help="隨機種子（不指定則不固定）")
+    parser.add_argument('--workers', type=int, default=1, help="平行程序數")
+    parser.add_argument('--output-dir', default='output', help="輸出目錄")
+    parser.add_argument('--tables', type=int,
+                        help="多桌模式：以多桌引擎同時模擬此數量的獨立牌桌（--hands 為每桌局數，不產生 Markdown 報告）")
+    parser.add_argument('--batch-shoes', type=int,
+                        help="批次模式：以 NumPy 批次引擎同時模擬此數量的獨立牌堆（--hands 為每個牌堆的局數，"
+                             "僅支援不依賴剩餘牌組成的查表策略，不產生 Markdown 報告）")
+    parser.add_argument('--sweep-decks', type=int, nargs='+',
+                        help="參數掃描模式：牌堆副數列表（與 --sweep-ratios、--sweep-params 及 --strategies 組合）")
+    parser.add_argument('--sweep-ratios', type=float, nargs='+', help="參數掃描模式：洗牌點列表，例如 0.25 0.4 0.5")
+    parser.add_argument('--sweep-params', type=json.loads,
+                        help='參數掃描模式：策略參數組合的 JSON 列表，例如 \'[{"stand_on": 16}, {"stand_on": 17}]\'')
+    parser.add_argument('--paired', action='store_true',
+                        help="共同隨機數模式：各策略使用相同的牌靴序列並輸出配對比較（單程序）")
+    parser.add_argument('--target-bust', type=float,
+                        help="目標精度模式：爆牌率 95%% 信賴區間半寬（例如 0.002），達成即停止，--hands 為上限")
+    parser.add_argument('--target-ev', type=float, help="目標精度模式：期望值 95%% 信賴區間半寬（例如 0.01）")
+    parser.add_argument('--check-every', type=int, default=1000, help="目標精度模式每隔多少局檢查一次")
+    parser.add_argument('--checkpoint-dir', help="定期將每個策略的進度寫入此目錄的檢查點（僅單程序模式）")
+    parser.add_argument('--checkpoint-every', type=int, default=10000, help="每隔多少局寫入一次檢查點")
+    parser.add_argument('--resume', action='store_true', help="若檢查點目錄中有未完成的執行，由檢查點繼續")
+    parser.add_argument('--result-store', help="將每局結果以欄式檔案保存到此目錄（可用 numpy.memmap 讀取）")
+    parser.add_argument('--instrument', action='store_true', help="啟用效能監測並輸出 instrumentation.json")
+    parser.add_argument('--catalog', help="執行目錄（SQLite 檔案）：參數與種子相同的執行直接取用先前結果")
+    parser.add_argument('--catalog-max-runs', type=int, default=1000, help="執行目錄最多保留的紀錄數（依最近使用淘汰）")
+    parser.add_argument('--format', choices=['json', 'csv', 'both'], default='both', help="結果檔案格式")
+    return parser.parse_args(argv)
+
+
+def summarize(simulator, strategies, metadata):
+    """整理各策略與各玩家的統計摘要"""
+    summary = {'metadata': metadata, 'strategies': {}}
+    for strategy in strategies:
+        stats = simulator.strategy_stats[strategy]
+        summary['strategies'][strategy] = {
+            'hands': stats.count,
+            'bust_rate': stats.bust_rate,
+            'average_points': stats.mean,
+            'variance': stats.variance,
+            'histogram': stats.histogram,
+            'players': {
+                player_id: {
+                    'hands': player_stats.count,
+                    'bust_rate': player_stats.bust_rate,
+                    'expected_value': simulator.expected_values[strategy][player_id],
+                    'variance': player_stats.variance
+                }
+                for player_id, player_stats in simulator.stats[strategy].items()
+            }
+        }
+    return summary
+
+
+def run_tables(args):
+    """多桌模式：每個策略以 TableEngine 同時推進 args.tables 張牌桌，返回摘要與各桌統計列"""
+    import numpy as np
+    from table_engine import TableEngine
+    summary = {'strategies': {}}
+    rows = []
+    for strategy in args.strategies:
+        engine = TableEngine(args.tables, args.decks, seed=args.seed, shuffle_ratio=args.shuffle_ratio)
+        stats = engine.run(strategy, args.hands)
+        tables = engine.table_summary()
+        summary['strategies'][strategy] = {
+            'hands': stats.count,
+            'bust_rate': stats.bust_rate,
+            'average_points': stats.mean,
+            'variance': stats.variance,
+            'histogram': stats.histogram,
+            'table_bust_rate': {
+                'min': float(tables['bust_rate'].min()),
+                'median': float(np.median(tables['bust_rate'])),
+                'max': float(tables['bust_rate'].max())
+            },
+            'bytes_per_table': engine.bytes_per_table
+        }
+        for table_id in range(args.tables):
+            rows.append([strategy, table_id, int(tables['hands'][table_id]), float(tables['bust_rate'][table_id]),
+                         float(tables['expected_value'][table_id])])
+        print(f"{strategy} 完成：{args.tables} 桌，爆牌率 {stats.bust_rate:.2%}")
+    return summary, rows
+
+
+def run_batch(args):
+    """批次模式：每個策略以 BatchSimulator 同時模擬 args.batch_shoes 個牌堆，返回摘要"""
+    from batch_simulation import BatchSimulator
+    from streaming_stats import StreamingStats
+    engine = BatchSimulator(args.decks, shuffle_ratio=args.shuffle_ratio)
+    summary = {'strategies': {}}
+    for strategy in args.strategies:
+        result = engine.run_batch(strategy, args.hands, args.batch_shoes, seed=args.seed)
+        stats = StreamingStats.from_histogram(result['histogram'])
+        summary['strategies'][strategy] = {
+            'hands': stats.count,
+            'bust_rate': stats.bust_rate,
+            'average_points': stats.mean,
+            'variance': stats.variance,
+            'histogram': stats.histogram
+        }
+        print(f"{strategy} 完成：{args.batch_shoes} 個牌堆，爆牌率 {stats.bust_rate:.2%}")
+    return summary
+
+
+def write_json(summary, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=4)
+
+
+def write_csv(summary, path):
+    """每列為一個 (策略, 玩家) 的統計"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['strategy', 'player_id', 'hands', 'bust_rate', 'expected_value', 'variance'])
+        for strategy, strategy_summary in summary['strategies'].items():
+            for player_id, player in strategy_summary['players'].items():
+                writer.writerow([strategy, player_id, player['hands'], player['bust_rate'],
+                                 player['expected_value'], player['variance']])
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    ratios = args.sweep_ratios or [args.shuffle_ratio]
+    decks = args.sweep_decks or [args.decks]
+    if not all(deck >= 1 for deck in decks) or not all(0 <= ratio < 1 for ratio in ratios):
+        print("參數錯誤：牌堆副數須為正整數，洗牌點須介於 0 到 1 之間")
+        return
+    if args.sweep_decks or args.sweep_ratios or args.sweep_params:
+        main_sweep(args)
+        return
+    if args.tables:
+        main_tables(args)
+        return
+    if args.batch_shoes:
+        main_batch(args)
+        return
+    result_store = ResultStore(args.result_store) if args.result_store else None
+    simulator = BlackjackSimulator(args.decks, keep_results=False, log_capacity=0, result_store=result_store,
+                                   shuffle_ratio=args.shuffle_ratio)
+    if args.catalog:
+        if args.seed is None or args.result_store or args.instrument:
+            print("執行目錄僅用於固定種子且未啟用 --result-store / --instrument 的執行，忽略 --catalog")
+        else:
+            simulator.catalog = RunCatalog(args.catalog, max_runs=args.catalog_max_runs)
+    if args.instrument:
+        simulator.enable_instrumentation()
+
+    targeted = args.target_bust is not None or args.target_ev is not None
+    if targeted and (args.paired or args.workers > 1):
+        print("目標精度模式僅支援單程序執行，忽略 --target-bust / --target-ev")
+        targeted = False
+    if args.checkpoint_dir and (args.paired or args.workers > 1):
+        print("檢查點僅支援單程序且非共同隨機數模式的執行，忽略 --checkpoint-dir / --resume")
+
+    start_time = time.time()
+    paired = None
+    if args.paired:
+        if args.workers > 1:
+            print("共同隨機數模式以單程序執行，忽略 --workers")
+        paired = simulator.run_paired(args.strategies, args.hands, args.players, seed=args.seed)
+    elif args.workers > 1:
+        simulator.run_parallel(args.strategies, args.hands, args.players, seed=args.seed, workers=args.workers)
+    else:
+        for strategy in args.strategies:
+            checkpoint_path = os.path.join(args.checkpoint_dir, f"{strategy}.json") if args.checkpoint_dir else None
+            if args.resume and checkpoint_path and os.path.exists(checkpoint_path):
+                print(f"{strategy} 由檢查點 {checkpoint_path} 繼續")
+                simulator.resume_simulation(checkpoint_path, checkpoint_every=args.checkpoint_every)
+            else:
+                simulator.run_simulation(strategy, args.hands, args.players, seed=args.seed,
+                                         checkpoint_path=checkpoint_path, checkpoint_every=args.checkpoint_every,
+                                         target_bust_halfwidth=args.target_bust, target_ev_halfwidth=args.target_ev,
+                                         check_every=args.check_every)
+            cached = "（取自執行目錄）" if strategy in simulator.cache_hits else ""
+            print(f"{strategy} 完成{cached}：爆牌率 {simulator.strategy_stats[strategy].bust_rate:.2%}")
+            if strategy in simulator.convergence:
+                convergence = simulator.convergence[strategy]
+                print(f"  {convergence['hands']} 局，爆牌率 ±{convergence['bust_halfwidth']:.4%}，"
+                      f"期望值 ±{convergence['ev_halfwidth']:.4f}"
+                      f"{'' if convergence['converged'] else '（已達局數上限，未達目標精度）'}")
+    elapsed = time.time() - start_time
+
+    metadata = {
+        'strategies': args.strategies,
+        'hands': args.hands,
+        'players': args.players,
+        'decks': args.decks,
+        'shuffle_ratio': args.shuffle_ratio,
+        'shuffle_threshold': simulator.shuffle_threshold,
+        'seed': args.seed,
+        'workers': args.workers,
+        'paired': args.paired,
+        'target_bust_halfwidth': args.target_bust if targeted else None,
+        'target_ev_halfwidth': args.target_ev if targeted else None,
+        'cached_strategies': [strategy for strategy in args.strategies if strategy in simulator.cache_hits],
+        'elapsed_seconds': elapsed
+    }
+    # 完整牌堆開局的精確理論值，供摘要與報告對照
+    from dealer_probability import DealerProbabilityEngine  # 需要 numpy，僅單次模擬時載入
+    exact = DealerProbabilityEngine(args.decks, simulator).distributions(args.strategies)
+    summary = summarize(simulator, args.strategies, metadata)
+    summary['exact'] = {strategy: {'bust_rate': DealerProbabilityEngine.bust_rate(exact[strategy]),
+                                   'expected_value': DealerProbabilityEngine.expected_value(exact[strategy])}
+                        for strategy in args.strategies}
+    if paired is not None:
+        summary['paired'] = paired
+    if simulator.convergence:
+        summary['convergence'] = {strategy: simulator.convergence[strategy]
+                                  for strategy in args.strategies if strategy in simulator.convergence}
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    artifacts = {}  # 產出檔案位置，記錄到執行目錄
+    if args.format in ('json', 'both'):
+        artifacts['results_json'] = os.path.join(args.output_dir, 'results.json')
+        write_json(summary, artifacts['results_json'])
+    if args.format in ('csv', 'both'):
+        artifacts['results_csv'] = os.path.join(args.output_dir, 'results.csv')
+        write_csv(summary, artifacts['results_csv'])
+    if args.instrument:
+        simulator.instrumentation.to_json(os.path.join(args.output_dir, 'instrumentation.json'))
+    # 報告直接由串流統計產生，不需保留每局結果
+    report = AnalysisReport.build_report(
+        {strategy: simulator.stats[strategy] for strategy in args.strategies},
+        simulator.expected_values, args.players, exact_distributions=exact, metadata=metadata, paired=paired
+    )
+    artifacts['report'] = os.path.join(args.output_dir, 'analysis_report.md')
+    AnalysisReport.save_report(report, artifacts['report'])
+    if simulator.catalog is not None:
+        for strategy in args.strategies:
+            if strategy in simulator.catalog_keys:
+                for name, path in artifacts.items():
+                    simulator.catalog.add_artifact(simulator.catalog_keys[strategy], name, path)
+    print(f"模擬完成，耗時 {elapsed:.2f} 秒，結果已寫入 {args.output_dir}")
+
+
+def main_tables(args):
+    start_time = time.time()
+    summary, rows = run_tables(args)
+    summary['metadata'] = {
+        'strategies': args.strategies,
+        'hands': args.hands,
+        'tables': args.tables,
+        'decks': args.decks,
+        'shuffle_ratio': args.shuffle_ratio,
+        'seed': args.seed,
+        'elapsed_seconds': time.time() - start_time
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.format in ('json', 'both'):
+        write_json(summary, os.path.join(args.output_dir, 'results.json'))
+    if args.format in ('csv', 'both'):
+        with open(os.path.join(args.output_dir, 'tables.csv'), 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['strategy', 'table_id', 'hands', 'bust_rate', 'expected_value'])
+            writer.writerows(rows)
+    print(f"模擬完成，耗時 {summary['metadata']['elapsed_seconds']:.2f} 秒，結果已寫入 {args.output_dir}")
+
+
+def main_batch(args):
+    unsupported = [strategy for strategy in args.strategies if registry.get(strategy).needs_composition]
+    if unsupported:
+        print(f"參數錯誤：批次引擎僅支援不依賴剩餘牌組成的查表策略，不支援 {', '.join(unsupported)}"
+              f"（請以 --strategies 指定，例如 --strategies basic conservative aggressive）")
+        return
+    start_time = time.time()
+    summary = run_batch(args)
+    summary['metadata'] = {
+        'strategies': args.strategies,
+        'hands': args.hands,
+        'shoes': args.batch_shoes,
+        'decks': args.decks,
+        'shuffle_ratio': args.shuffle_ratio,
+        'seed': args.seed,
+        'elapsed_seconds': time.time() - start_time
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.format in ('json', 'both'):
+        write_json(summary, os.path.join(args.output_dir, 'results.json'))
+    if args.format in ('csv', 'both'):
+        with open(os.path.join(args.output_dir, 'batch.csv'), 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['strategy', 'hands', 'bust_rate', 'expected_value', 'variance'])
+            for strategy, result in summary['strategies'].items():
+                writer.writerow([strategy, result['hands'], result['bust_rate'], result['average_points'],
+                                 result['variance']])
+    print(f"模擬完成，耗時 {summary['metadata']['elapsed_seconds']:.2f} 秒，結果已寫入 {args.output_dir}")
+
+
+def main_sweep(args):
+    """參數掃描模式：每格完成即寫入 sweep.csv，結束後繪製爆牌率與期望值熱圖"""
+    from parameter_sweep import ParameterSweep
+    try:
+        sweep = ParameterSweep(
+            decks=args.sweep_decks or [args.decks],
+            shuffle_ratios=args.sweep_ratios or [args.shuffle_ratio],
+            strategies=args.strategies,
+            params=args.sweep_params or [{}],
+            num_hands=args.hands,
+            num_players=args.players,
+            seed=args.seed
+        )
+    except ValueError as e:
+        print(f"參數錯誤：{e}")
+        return
+    cells = sweep.cells()
+    print(f"參數掃描：共 {len(cells)} 格")
+    start_time = time.time()
+    done = []
+
+    def on_result(row):
+        done.append(row)
+        print(f"[{len(done)}/{len(cells)}] {row['strategy']} {row['params'] or ''} 副數 {row['decks']} "
+              f"洗牌點 {row['shuffle_ratio']:.0%}：爆牌率 {row['bust_rate']:.2%}，期望值 {row['expected_value']:.3f}")
+
+    rows = sweep.run(args.workers, os.path.join(args.output_dir, 'sweep.csv'), on_result)
+    for value in ('bust_rate', 'expected_value'):
+        ParameterSweep.heatmap(rows, os.path.join(args.output_dir, f"sweep_{value}.png"), value)
+    print(f"參數掃描完成，耗時 {time.time() - start_time:.2f} 秒，結果已寫入 {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import numpy as np
+from blackjack_simulation import BlackjackSimulator
+from deck import RANKS, RANK_CLASSES, NUM_CLASSES, RANK_VALUES
+from strategy_registry import registry
+
+
+class DealerProbabilityEngine:
+    """精確計算莊家最終點數分佈的解析引擎，可作為蒙地卡羅模擬的對照基準"""
+
+    max_total = 32  # 分佈陣列長度，與批次引擎的直方圖一致
+
+    def __init__(self, num_decks=6, simulator=None):
+        self.num_decks = num_decks
+        # 決策邏輯直接取自模擬器，確保與模擬結果定義一致
+        self.simulator = simulator or BlackjackSimulator(num_decks)
+        self.class_values = [RANK_VALUES[rank] for rank in range(NUM_CLASSES)]  # A=11, 2..9, 10
+
+    def full_shoe(self):
+        """完整牌堆的點數類別計數"""
+        return self.class_counts([4 * self.num_decks] * len(RANKS))
+
+    @staticmethod
+    def class_counts(rank_counts):
+        """將牌值計數（索引對應 RANKS，如 Deck.rank_counts）合併為點數類別計數"""
+        counts = [0] * NUM_CLASSES
+        for rank, count in enumerate(rank_counts):
+            counts[RANK_CLASSES[rank]] += count
+        return tuple(counts)
+
+    def final_distribution(self, strategy_name, rank_counts=None):
+        """返回從指定剩餘牌（預設完整牌堆）開局時，最終點數的機率分佈 {點數: 機率}"""
+        counts = self.full_shoe() if rank_counts is None else self.class_counts(rank_counts)
+        decide = self.simulator.get_decision(strategy_name)
+        memo = {}
+
+        def expand(counts):
+            # 決策函式以 RANKS 索引讀取計數；10 點類別全部放在 '10'，J/Q/K 為 0
+            return counts + (0,) * (len(RANKS) - NUM_CLASSES)
+
+        def distribution(hard, has_ace, drawn, counts):
+            key = (hard, has_ace, drawn, counts)
+            if key in memo:
+                return memo[key]
+
+            total = hard + 10 if has_ace and hard + 10 <= 21 else hard
+            soft = has_ace and hard + 10 <= 21
+            remaining = sum(counts)
+            result = np.zeros(self.max_total)
+            if drawn >= 2 and (remaining == 0 or not decide(total, soft, expand(counts), remaining)):
+                result[total] = 1.0
+            elif remaining == 0:
+                # 起始牌不足兩張時牌堆已空（僅極小牌堆會發生），以當前點數結束
+                result[total] = 1.0
+            else:
+                for value_class, count in enumerate(counts):
+                    if not count:
+                        continue
+                    value = 1 if value_class == 0 else self.class_values[value_class]
+                    next_counts = counts[:value_class] + (count - 1,) + counts[value_class + 1:]
+                    result += (count / remaining) * distribution(
+                        hard + value, has_ace or value_class == 0, drawn + 1, next_counts
+                    )
+            memo[key] = result
+            return result
+
+        probabilities = distribution(0, False, 0, counts)
+        return {total: float(p) for total, p in enumerate(probabilities) if p > 0}
+
+    def distributions(self, strategy_names=None, rank_counts=None):
+        """返回多個策略的最終點數分佈 {策略: {點數: 機率}}"""
+        return {
+            strategy: self.final_distribution(strategy, rank_counts)
+            for strategy in (strategy_names or registry.names())
+        }
+
+    @staticmethod
+    def bust_rate(distribution):
+        """由分佈計算爆牌率"""
+        return sum(p for total, p in distribution.items() if total > 21)
+
+    @staticmethod
+    def expected_value(distribution):
+        """由分佈計算期望值（與 calculate_expected_value 相同，爆牌計為 21）"""
+        return sum(min(total, 21) * p for total, p in distribution.items())
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+
+
+class DecisionCache:
+    """有界 LRU 決策快取，鍵為 (總點數, 軟牌, 剩餘牌組成編碼)；統計只計入真正依組成的查詢"""
+
+    def __init__(self, maxsize=65536):
+        """maxsize 為最多保留的決策數，0 表示停用快取"""
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """返回快取的決策，未命中時返回 None"""
+        try:
+            decision = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return decision
+
+    def put(self, key, decision):
+        """寫入決策，超過容量時淘汰最久未使用的項目"""
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = decision
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, maxsize):
+        """調整容量，必要時淘汰最久未使用的項目"""
+        self.maxsize = maxsize
+        while self._entries and len(self._entries) > max(maxsize, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """清空快取與統計"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """返回命中、未命中、淘汰次數等統計"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
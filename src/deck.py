@@ -1,40 +1,197 @@
 import random
+from array import array
+
+RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+SUITS = ['♠', '♥', '♦', '♣']
+RANK_VALUES = [11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10]  # A 先以 11 點計
+
+# 牌碼：rank_index * 4 + suit_index（0..51），牌堆只存牌碼，字串僅在需要顯示時產生
+CARD_RANKS = [code >> 2 for code in range(52)]
+CARD_VALUES = [RANK_VALUES[code >> 2] for code in range(52)]
+
+# 點數類別：A, 2..9, 10 點牌（10/J/Q/K）共 10 類，用於剩餘牌組成編碼
+RANK_CLASSES = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 9, 9, 9]
+NUM_CLASSES = 10
+
+MAX_CARD_VALUE = 11  # 點數值索引 0..11，A 以 11 點計（與 RANK_VALUES 一致）
+
+
+def card_to_str(code):
+    """將牌碼轉為字串，例如 37 -> '10♥'"""
+    return RANKS[code >> 2] + SUITS[code & 3]
+
+
+def card_from_str(card):
+    """將字串轉為牌碼，例如 '10♥' -> 37；僅有牌值（如 'K'）時以黑桃表示"""
+    if card[-1] in SUITS:
+        return (RANKS.index(card[:-1]) << 2) | SUITS.index(card[-1])
+    return RANKS.index(card) << 2
+
 
 class Deck:
-    def __init__(self, num_decks=1):
-        """初始化牌堆，包含 num_decks 副牌（每副 52 張）"""
+    def __init__(self, num_decks=1, seed=None):
+        """初始化牌堆，包含 num_decks 副牌（每副 52 張）；seed 固定時洗牌順序可重現"""
         self.num_decks = num_decks
-        self.ranks = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
-        self.suits = ['♠', '♥', '♦', '♣']
-        self.cards = []
-        self.used_cards = []  # 新增：追蹤已用牌
+        self.rng = random.Random(seed)  # 每個牌堆獨立的亂數流
+        self.ranks = RANKS
+        self.suits = SUITS
+        # 預先配置的牌碼緩衝區：[0, _pos) 為已用牌，[_pos, 結尾) 為剩餘牌
+        self._buffer = array('B')
+        self._pos = 0
+        # 即時維護的剩餘牌值計數（索引對應 RANKS），抽牌與洗牌時同步更新
+        self._counts = [0] * len(RANKS)
+        # 剩餘牌組成的緊湊整數編碼：每個點數類別佔 _key_bits 位元，抽牌時遞減
+        self._key_bits = (16 * num_decks).bit_length()
+        self._key_units = [1 << (self._key_bits * RANK_CLASSES[rank]) for rank in range(len(RANKS))]
+        self._full_key = sum(unit * 4 * num_decks for unit in self._key_units)
+        self._composition_key = self._full_key
+        # 依點數值（A 計 11）的剩餘張數與剩餘點數總和，抽牌時以 O(1) 同步更新。
+        # 「點數至少為 v 的張數」累計表不逐張維護：抽牌只將其標記為失效，
+        # 抽牌後第一次查詢時以 12 個點數值重建（惰性重建），同一狀態的後續查詢為查表。
+        # 逐張遞減累計表每次抽牌需更新最多 12 項，實測使 draw() 吞吐量約減半，
+        # 而多數策略每次抽牌至多查詢一次，因此惰性重建的總成本較低。
+        self._full_value_counts = [0] * (MAX_CARD_VALUE + 1)
+        for rank in range(len(RANKS)):
+            self._full_value_counts[RANK_VALUES[rank]] += 4 * num_decks
+        self._full_value_sum = sum(RANK_VALUES) * 4 * num_decks
+        self._value_counts = list(self._full_value_counts)
+        self._value_sum = self._full_value_sum
+        self._at_least = None  # _at_least[v] 為點數 >= v 的剩餘張數；None 表示需重建
+        self.shuffles = 0  # 累計洗牌次數，第 k 次洗牌後的牌序即第 k 個牌靴
         self.reset()
 
     def reset(self):
         """重置牌堆，生成 num_decks 副新牌"""
-        self.cards = [rank + suit for rank in self.ranks for suit in self.suits] * self.num_decks
-        self.used_cards = []  # 清空已用牌
-        random.shuffle(self.cards)
+        self._buffer = array('B', range(52)) * self.num_decks
+        self.shuffle()
 
     def shuffle(self):
-        """洗牌，將已用牌放回牌堆並隨機重排"""
-        # 將已用牌放回牌堆
-        self.cards.extend(self.used_cards)
-        self.used_cards = []  # 清空已用牌
-        random.shuffle(self.cards)
+        """洗牌，將已用牌放回牌堆並隨機重排（原地重排緩衝區）"""
+        self.rng.shuffle(self._buffer)
+        self.shuffles += 1
+        self._pos = 0
+        self._counts = [4 * self.num_decks] * len(RANKS)
+        self._composition_key = self._full_key
+        self._value_counts = list(self._full_value_counts)
+        self._value_sum = self._full_value_sum
+        self._at_least = None
 
     def draw(self):
-        """抽一張牌，若牌堆空則洗牌"""
-        if not self.cards:
+        """抽一張牌（返回牌碼），若牌堆空則洗牌"""
+        if self._pos >= len(self._buffer):
             self.shuffle()
-        card = self.cards.pop()
-        self.used_cards.append(card)  # 記錄已用牌
+        card = self._buffer[self._pos]
+        self._pos += 1
+        rank = CARD_RANKS[card]
+        self._counts[rank] -= 1
+        self._composition_key -= self._key_units[rank]
+        value = CARD_VALUES[card]
+        self._value_counts[value] -= 1
+        self._value_sum -= value
+        self._at_least = None
         return card
 
+    def remaining_count(self):
+        """返回剩餘牌數"""
+        return len(self._buffer) - self._pos
+
+    @property
+    def rank_counts(self):
+        """剩餘牌值計數（唯讀 tuple，索引對應 RANKS）"""
+        return tuple(self._counts)
+
+    @property
+    def composition_key(self):
+        """剩餘牌點數組成的整數編碼（組成相同則編碼相同），供決策快取使用"""
+        return self._composition_key
+
+    def bust_count(self, total):
+        """剩餘牌中補牌後會使 total 超過 21 點的張數（A 以 11 點計）
+
+        抽牌後的第一次查詢需重建累計表（12 次加法），之後至下次抽牌前皆為查表。
+        """
+        threshold = 22 - total
+        if threshold > MAX_CARD_VALUE:
+            return 0
+        at_least = self._at_least
+        if at_least is None:
+            # 由高到低累加 12 個點數值即可重建，之後每次查詢為查表
+            at_least = [0] * (MAX_CARD_VALUE + 2)
+            for value in range(MAX_CARD_VALUE, -1, -1):
+                at_least[value] = at_least[value + 1] + self._value_counts[value]
+            self._at_least = at_least
+        return at_least[max(threshold, 0)]
+
+    def bust_probability(self, total):
+        """下一張牌使 total 超過 21 點的概率"""
+        remaining = len(self._buffer) - self._pos
+        return self.bust_count(total) / remaining if remaining else 0.0
+
+    def expected_card_value(self):
+        """下一張牌的期望點數（A 以 11 點計），由剩餘點數總和直接計算"""
+        remaining = len(self._buffer) - self._pos
+        return self._value_sum / remaining if remaining else 0.0
+
+    def count(self, rank_index):
+        """返回某牌值（RANKS 索引）的剩餘張數"""
+        return self._counts[rank_index]
+
+    def probability(self, rank_index):
+        """返回下一張牌為某牌值（RANKS 索引）的概率"""
+        remaining = len(self._buffer) - self._pos
+        return self._counts[rank_index] / remaining if remaining else 0.0
+
+    def probabilities(self):
+        """返回各牌值的出現概率（tuple，索引對應 RANKS）"""
+        remaining = len(self._buffer) - self._pos
+        if not remaining:
+            return (0.0,) * len(RANKS)
+        return tuple(count / remaining for count in self._counts)
+
+    @property
+    def cards(self):
+        """剩餘牌的字串列表（僅供顯示，逐張產生字串）"""
+        return [card_to_str(code) for code in self._buffer[self._pos:]]
+
+    @property
+    def used_cards(self):
+        """已用牌的字串列表（僅供顯示，逐張產生字串）"""
+        return [card_to_str(code) for code in self._buffer[:self._pos]]
+
     def get_remaining_cards(self):
-        """返回剩餘牌的計數字典（僅包含 self.cards）"""
-        counts = {}
-        for card in self.cards:
-            rank = card[:-1] if card[-1] in ['♠', '♥', '♦', '♣'] else card
-            counts[rank] = counts.get(rank, 0) + 1
-        return counts
\ No newline at end of file
+        """返回剩餘牌的計數字典（由即時計數產生，僅包含尚有剩餘的牌值）"""
+        return {rank: count for rank, count in zip(RANKS, self._counts) if count}
+
+    def get_state(self):
+        """返回可完整還原牌堆的狀態：牌序（bytes）、已抽張數與亂數產生器狀態"""
+        return {
+            'num_decks': self.num_decks,
+            'buffer': self._buffer.tobytes(),
+            'pos': self._pos,
+            'shuffles': self.shuffles,
+            'rng': self.rng.getstate()
+        }
+
+    def set_state(self, state):
+        """由 get_state() 的結果還原牌堆，剩餘牌計數與組成編碼依牌序重算"""
+        self._buffer = array('B', state['buffer'])
+        self._pos = state['pos']
+        self.shuffles = state.get('shuffles', 0)
+        self.rng.setstate(state['rng'])
+        self._counts = [0] * len(RANKS)
+        self._value_counts = [0] * (MAX_CARD_VALUE + 1)
+        composition_key = 0
+        for card in self._buffer[self._pos:]:
+            rank = CARD_RANKS[card]
+            self._counts[rank] += 1
+            self._value_counts[CARD_VALUES[card]] += 1
+            composition_key += self._key_units[rank]
+        self._composition_key = composition_key
+        self._value_sum = sum(value * count for value, count in enumerate(self._value_counts))
+        self._at_least = None
+
+    @classmethod
+    def from_state(cls, state):
+        deck = cls(state['num_decks'])
+        deck.set_state(state)
+        return deck
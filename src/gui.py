@@ -1,49 +1,56 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import ttkbootstrap as ttkb
 from ttkbootstrap.constants import *
 from blackjack_simulation import BlackjackSimulator
-from result_plotter import ResultPlotter
-from PIL import Image, ImageTk
+from deck import RANKS, RANK_VALUES
+from snapshot_bridge import SnapshotBridge
+from log_viewer import HandLogViewer
+from run_catalog import RunCatalog
+from strategy_registry import registry
 import threading
 import time
 import json
 import os
-import matplotlib.pyplot as plt
+
+MIN_UPDATE_INTERVAL = 50  # 介面更新間隔下限（毫秒），過短會使 Tk 主執行緒忙於重繪
 
 class BlackjackGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("21點莊家策略模擬器")
-        self.simulator = BlackjackSimulator()
+        self.simulator = BlackjackSimulator(keep_results=False)  # 介面僅使用串流統計
         self.is_running = False
         self.show_log = tk.BooleanVar(value=False)
+        self.show_instrumentation = tk.BooleanVar(value=False)
+        self.paired_mode = tk.BooleanVar(value=False)
+        self.use_catalog = tk.BooleanVar(value=True)
+        self.paired_results = None
+        self.targets = None  # 目標精度模式的 (爆牌率半寬, 期望值半寬)
         self.chart_type = tk.StringVar(value="最終手牌點數分佈")
-        self.strategies_cn = {
-            'basic': '基本策略',
-            'conservative': '保守策略',
-            'aggressive': '激進策略',
-            'adaptive': '自適應策略',
-            'advanced': '高級自適應策略'
-        }
-        self.last_update_time = 0
-        self.image_cache = None
+        self.strategies_cn = registry.labels()
+        self.bridge = None  # 目前模擬執行緒的快照佇列
+        self.stopping = False  # 已要求停止、等待模擬執行緒結束
+        self.live_chart = None  # 首次顯示圖表時才建立（延遲載入 matplotlib）
+        self.exact_distributions = {}  # 圖表疊加的理論分佈 {(策略, 牌堆副數, 策略參數): 分佈}
+        self.chart_strategy = None
         self.start_time = None
         self.settings = {
             'theme': 'flatly',
             'font_size': 12,
-            'update_interval': 100
+            'update_interval': 100,
+            'log_capacity': 1000
         }
         self.settings_path = os.path.join('config', 'settings.json')
-        self.img_dir = 'img'
+        self.checkpoint_dir = 'checkpoints'
+        self.catalog_path = 'run_catalog.sqlite'
+        self.catalog = None  # 首次啟用執行目錄時才開啟
         os.makedirs('config', exist_ok=True)  # 確保 config 目錄存在
-        os.makedirs(self.img_dir, exist_ok=True)
         self.expectation_window = None
         self.expectation_table = None
         self.style = None
         self.load_settings()
         self.setup_gui()
-        self.root.bind('<Configure>', self.resize_images)
 
     def load_settings(self):
         try:
@@ -58,6 +65,11 @@ class BlackjackGUI:
                         loaded_settings['font_size'] = font_size
                     else:
                         loaded_settings['font_size'] = 12
+                    update_interval = loaded_settings.get('update_interval', 100)
+                    if isinstance(update_interval, int):
+                        loaded_settings['update_interval'] = max(MIN_UPDATE_INTERVAL, update_interval)
+                    else:
+                        loaded_settings['update_interval'] = 100
                     self.settings.update(loaded_settings)
         except Exception as e:
             print(f"載入設定失敗: {e}")
@@ -74,7 +86,8 @@ class BlackjackGUI:
         self.settings = {
             'theme': 'flatly',
             'font_size': 12,
-            'update_interval': 100
+            'update_interval': 100,
+            'log_capacity': 1000
         }
         self.apply_settings()
         self.save_settings()
@@ -143,7 +156,7 @@ class BlackjackGUI:
         font_size_entry = ttkb.Entry(frame, textvariable=font_size_var, width=10)
         font_size_entry.pack(anchor=tk.W, pady=5)
 
-        ttkb.Label(frame, text="圖表更新間隔（局）：", font=("微軟正黑體", 12)).pack(anchor=tk.W, pady=5)
+        ttkb.Label(frame, text=f"介面更新間隔（毫秒，至少 {MIN_UPDATE_INTERVAL}）：", font=("微軟正黑體", 12)).pack(anchor=tk.W, pady=5)
         update_interval_var = tk.StringVar(value=str(self.settings['update_interval']))
         update_interval_entry = ttkb.Entry(frame, textvariable=update_interval_var, width=10)
         update_interval_entry.pack(anchor=tk.W, pady=5)
@@ -181,8 +194,8 @@ class BlackjackGUI:
             if not (8 <= font_size <= 20):
                 raise ValueError("文字字號必須介於 8 到 20")
             update_interval = int(update_interval_var.get())
-            if update_interval <= 0:
-                raise ValueError("更新間隔必須為正整數")
+            if update_interval < MIN_UPDATE_INTERVAL:
+                raise ValueError(f"更新間隔不得小於 {MIN_UPDATE_INTERVAL} 毫秒")
             self.settings.update({
                 'theme': theme_var.get(),
                 'font_size': font_size,
@@ -193,6 +206,35 @@ class BlackjackGUI:
         except ValueError as e:
             messagebox.showerror("錯誤", f"無效輸入: {e}")
 
+    def show_paired_results(self, comparisons):
+        """以表格顯示共同隨機數模式的配對比較"""
+        window = ttkb.Toplevel(self.root)
+        window.title("配對比較（共同隨機數）")
+        window.geometry("900x240")
+        window.transient(self.root)
+        
+        frame = ttkb.LabelFrame(window, text="策略差異（A - B，以牌靴為配對單位）", padding=5)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        columns = ['策略 A', '策略 B', '牌靴數', '爆牌率差', '爆牌率 95% CI', '期望值差', '期望值 95% CI', '變異數縮減']
+        table = ttk.Treeview(frame, columns=columns, show='headings', height=6)
+        for col in columns:
+            table.heading(col, text=col)
+            table.column(col, width=105, anchor='center')
+        for c in comparisons:
+            bust, ev = c['bust_rate'], c['expected_value']
+            table.insert('', 'end', values=[
+                self.strategies_cn[c['strategy_a']],
+                self.strategies_cn[c['strategy_b']],
+                c['shoes'],
+                f"{bust['difference']:+.2%}",
+                f"{bust['ci'][0]:+.2%} ~ {bust['ci'][1]:+.2%}",
+                f"{ev['difference']:+.3f}",
+                f"{ev['ci'][0]:+.3f} ~ {ev['ci'][1]:+.3f}",
+                f"{ev['variance_reduction']:.1f} 倍"
+            ])
+        table.pack(fill=tk.BOTH, expand=True)
+
     def create_expectation_window(self):
         if self.expectation_window is not None:
             self.expectation_window.destroy()
@@ -247,15 +289,7 @@ class BlackjackGUI:
         ).pack(side=tk.LEFT)
         
         self.strategy_vars = {}
-        strategies = {
-            'basic': '基本策略 (17點停牌)',
-            'conservative': '保守策略 (16點停牌)',
-            'aggressive': '激進策略 (18點停牌)',
-            'adaptive': '自適應策略 (基於爆牌概率)',
-            'advanced': '高級自適應策略 (基於期望值)'
-        }
-        
-        for strat, label in strategies.items():
+        for strat, label in registry.descriptions().items():
             var = tk.BooleanVar(value=True)
             self.strategy_vars[strat] = var
             chk = ttkb.Checkbutton(
@@ -289,7 +323,24 @@ class BlackjackGUI:
         
         ttkb.Label(
             param_frame, 
-            text="更新間隔（局）：", 
+            text="平行程序數：", 
+            font=("微軟正黑體", 12)
+        ).pack(side=tk.LEFT)
+        self.num_workers = ttkb.Entry(param_frame, width=5)
+        self.num_workers.insert(0, "1")
+        self.num_workers.pack(side=tk.LEFT, padx=5)
+        
+        ttkb.Label(
+            param_frame, 
+            text="隨機種子：", 
+            font=("微軟正黑體", 12)
+        ).pack(side=tk.LEFT)
+        self.seed_entry = ttkb.Entry(param_frame, width=10)  # 留空表示不固定種子
+        self.seed_entry.pack(side=tk.LEFT, padx=5)
+        
+        ttkb.Label(
+            param_frame, 
+            text="更新間隔（毫秒）：", 
             font=("微軟正黑體", 12)
         ).pack(side=tk.LEFT)
         self.update_interval = ttkb.Entry(param_frame, width=10)
@@ -302,6 +353,66 @@ class BlackjackGUI:
             variable=self.show_log,
             bootstyle="round-toggle"
         ).pack(side=tk.LEFT, padx=10)
+        
+        ttkb.Checkbutton(
+            param_frame,
+            text="效能監測",
+            variable=self.show_instrumentation,
+            bootstyle="round-toggle"
+        ).pack(side=tk.LEFT, padx=10)
+        
+        ttkb.Checkbutton(
+            param_frame,
+            text="共同隨機數（配對比較）",
+            variable=self.paired_mode,
+            bootstyle="round-toggle"
+        ).pack(side=tk.LEFT, padx=10)
+        
+        ttkb.Checkbutton(
+            param_frame,
+            text="執行目錄快取",
+            variable=self.use_catalog,
+            bootstyle="round-toggle"
+        ).pack(side=tk.LEFT, padx=10)
+
+        # 牌靴設定與目標精度模式（目標留空表示不啟用，啟用時「模擬局數」為每位玩家的上限）
+        precision_frame = ttkb.Frame(control_frame)
+        precision_frame.pack(fill=tk.X, pady=5)
+        ttkb.Label(
+            precision_frame, 
+            text="牌堆副數：", 
+            font=("微軟正黑體", 12)
+        ).pack(side=tk.LEFT)
+        self.num_decks_entry = ttkb.Entry(precision_frame, width=5)
+        self.num_decks_entry.insert(0, str(self.simulator.num_decks))
+        self.num_decks_entry.pack(side=tk.LEFT, padx=5)
+        ttkb.Label(
+            precision_frame, 
+            text="洗牌點（%）：", 
+            font=("微軟正黑體", 12)
+        ).pack(side=tk.LEFT)
+        self.shuffle_ratio_entry = ttkb.Entry(precision_frame, width=5)
+        self.shuffle_ratio_entry.insert(0, f"{self.simulator.shuffle_ratio * 100:g}")
+        self.shuffle_ratio_entry.pack(side=tk.LEFT, padx=5)
+        ttkb.Label(
+            precision_frame, 
+            text="目標爆牌率半寬（%）：", 
+            font=("微軟正黑體", 12)
+        ).pack(side=tk.LEFT)
+        self.target_bust_entry = ttkb.Entry(precision_frame, width=8)
+        self.target_bust_entry.pack(side=tk.LEFT, padx=5)
+        ttkb.Label(
+            precision_frame, 
+            text="目標期望值半寬：", 
+            font=("微軟正黑體", 12)
+        ).pack(side=tk.LEFT)
+        self.target_ev_entry = ttkb.Entry(precision_frame, width=8)
+        self.target_ev_entry.pack(side=tk.LEFT, padx=5)
+        ttkb.Label(
+            precision_frame, 
+            text="（95% 信賴區間，達成即停止，模擬局數為上限）", 
+            font=("微軟正黑體", 10)
+        ).pack(side=tk.LEFT)
 
         chart_frame = ttkb.Frame(control_frame)
         chart_frame.pack(fill=tk.X, pady=5)
@@ -318,6 +429,7 @@ class BlackjackGUI:
             width=20
         )
         self.chart_combobox.pack(side=tk.LEFT, padx=5)
+        self.chart_combobox.bind('<<ComboboxSelected>>', lambda event: self.refresh_chart())
 
         settings_button = ttkb.Button(
             control_frame,
@@ -340,6 +452,15 @@ class BlackjackGUI:
         )
         self.start_button.pack(side=tk.LEFT, padx=5)
         
+        self.resume_button = ttkb.Button(
+            button_frame, 
+            text="繼續模擬", 
+            command=self.resume_simulation, 
+            bootstyle=SUCCESS,
+            width=15
+        )
+        self.resume_button.pack(side=tk.LEFT, padx=5)
+        
         self.stop_button = ttkb.Button(
             button_frame, 
             text="停止模擬", 
@@ -359,6 +480,24 @@ class BlackjackGUI:
         )
         self.clear_log_button.pack(side=tk.LEFT, padx=5)
         
+        self.export_chart_button = ttkb.Button(
+            button_frame, 
+            text="匯出圖表", 
+            command=self.export_chart, 
+            bootstyle=SECONDARY,
+            width=15
+        )
+        self.export_chart_button.pack(side=tk.LEFT, padx=5)
+        
+        self.export_instrumentation_button = ttkb.Button(
+            button_frame, 
+            text="匯出效能資料", 
+            command=self.export_instrumentation, 
+            bootstyle=SECONDARY,
+            width=15
+        )
+        self.export_instrumentation_button.pack(side=tk.LEFT, padx=5)
+        
         self.progress = ttkb.Progressbar(
             control_frame, 
             mode='indeterminate', 
@@ -417,72 +556,80 @@ class BlackjackGUI:
         )
         self.elapsed_time_label.pack(anchor=tk.W)
         
-        log_frame = ttkb.LabelFrame(left_frame, text="牌局過程 Log", padding=5)
-        log_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.halfwidth_label = ttkb.Label(
+            self.stats_frame, 
+            text="信賴區間半寬：-", 
+            font=("微軟正黑體", 12)
+        )
+        self.halfwidth_label.pack(anchor=tk.W)
         
-        self.log_text = tk.Text(
-            log_frame, 
-            height=20, 
-            width=50, 
+        self.instrumentation_label = ttkb.Label(
+            self.stats_frame, 
+            text="", 
             font=("微軟正黑體", 10),
-            wrap=tk.WORD,
-            borderwidth=2,
-            relief="groove"
+            justify=tk.LEFT
         )
-        self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.instrumentation_label.pack(anchor=tk.W)
         
-        scrollbar = ttkb.Scrollbar(
-            log_frame, 
-            orient=tk.VERTICAL, 
-            command=self.log_text.yview,
-            takefocus=True
-        )
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.log_text.config(yscrollcommand=scrollbar.set)
-        self.log_text.config(state='disabled')
+        log_frame = ttkb.LabelFrame(left_frame, text="牌局過程 Log", padding=5)
+        log_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        
+        self.log_viewer = HandLogViewer(log_frame, self.simulator, self.strategies_cn)
         
         self.image_frame = ttkb.Frame(self.paned_window)
         self.paned_window.add(self.image_frame, weight=1)
 
-        self.image_label = ttkb.Label(self.image_frame)
-        self.image_label.pack(fill=tk.BOTH, expand=True)
-
         self.apply_settings()
 
-    def resize_images(self, event=None):
-        if not hasattr(self, 'current_image_path') or not self.current_image_path:
+    def get_live_chart(self):
+        if self.live_chart is None:
+            from live_chart import LiveChart
+            self.live_chart = LiveChart(self.image_frame)
+        return self.live_chart
+
+    def refresh_chart(self, strategy=None, stats=None):
+        """依圖表類型原地更新嵌入圖表；未指定時使用最近顯示的策略"""
+        strategy = strategy or self.chart_strategy
+        if stats is None and strategy is not None:
+            stats = self.simulator.strategy_stats.get(strategy)
+        try:
+            if self.chart_type.get() == "最終手牌點數分佈":
+                if stats is not None:
+                    self.chart_strategy = strategy
+                    self.get_live_chart().show_distribution(stats, strategy, self.exact_distribution(strategy))
+            elif self.simulator.strategy_stats:
+                self.get_live_chart().show_comparison(dict(self.simulator.strategy_stats))
+        except Exception as e:
+            print(f"圖表更新失敗: {e}")
+
+    def exact_distribution(self, strategy):
+        """完整牌堆開局的精確最終點數分佈（依牌堆副數與策略參數快取），供分佈圖疊加理論值"""
+        key = (strategy, self.simulator.num_decks, tuple(sorted(self.simulator.strategy_params().items())))
+        if key not in self.exact_distributions:
+            from dealer_probability import DealerProbabilityEngine  # 需要 numpy，首次繪圖時才載入
+            engine = DealerProbabilityEngine(self.simulator.num_decks, self.simulator)
+            self.exact_distributions[key] = engine.final_distribution(strategy)
+        return self.exact_distributions[key]
+
+    def export_chart(self):
+        """將目前圖表匯出為圖片檔"""
+        if self.live_chart is None:
+            messagebox.showinfo("提示", "尚無圖表可匯出")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".png",
+            filetypes=[("PNG", "*.png")],
+            initialfile="chart.png"
+        )
+        if not path:
             return
-        
         try:
-            window_width = self.image_frame.winfo_width()
-            window_height = self.image_frame.winfo_height()
-            max_width = min(1200, int(window_width * 0.8))
-            max_height = min(900, int(window_height * 0.8))
-            
-            img = Image.open(self.current_image_path)
-            img_width, img_height = img.size
-            scale = min(max_width / img_width, max_height / img_height)
-            new_width = int(img_width * scale)
-            new_height = int(img_height * scale)
-            
-            if new_width < 600:
-                new_width = 600
-                new_height = int(600 * img_height / img_width)
-            if new_height < 450:
-                new_height = 450
-                new_width = int(450 * img_width / img_height)
-            
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-            self.image_label.config(image=photo)
-            self.image_cache = photo
+            self.live_chart.export(path)
         except Exception as e:
-            print(f"圖像加載失敗: {e}")
+            messagebox.showerror("錯誤", f"圖表匯出失敗: {e}")
 
     def clear_log(self):
-        self.log_text.config(state='normal')
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.config(state='disabled')
+        self.log_viewer.clear()
         if self.expectation_table is not None:
             for item in self.expectation_table.get_children():
                 self.expectation_table.delete(item)
@@ -491,25 +638,19 @@ class BlackjackGUI:
         self.bust_rate_label.config(text="爆牌率：0.0%")
         self.total_ev_label.config(text="期望點數總和：0.0")
         self.elapsed_time_label.config(text="經過時間：0.0 秒")
+        self.halfwidth_label.config(text="信賴區間半寬：-")
 
-    def update_results(self, strategy, results, logs=None, remaining_cards=None):
-        if not self.is_running:
-            return
-        
+    def update_results(self, strategy, stats, logs=None, remaining_cards=None, expected_card_value=None):
+        """以最新快照更新介面（僅在 Tk 主執行緒中由 poll_bridge 呼叫）"""
         current_time = time.time()
-        update_interval = self.settings['update_interval'] / 1000
-        if current_time - self.last_update_time < update_interval:
-            return
         
-        self.last_update_time = current_time
-        
-        bust_rate = sum(1 for x in results if x > 21) / len(results) if results else 0
+        bust_rate = stats.bust_rate
         self.result_label.config(
-            text=f"{self.strategies_cn[strategy]}：爆牌率：{bust_rate:.2%}，模擬局數：{len(results)}"
+            text=f"{self.strategies_cn[strategy]}：爆牌率：{bust_rate:.2%}，模擬局數：{stats.count}"
         )
         
-        total_cards = sum(remaining_cards.values()) if remaining_cards else 0
-        avg_points = sum(min(r, 21) for r in results) / len(results) if results else 0
+        total_cards = sum(remaining_cards) if remaining_cards else 0
+        avg_points = stats.mean
         self.remaining_cards_label.config(text=f"剩餘牌數：{total_cards} 張")
         self.avg_points_label.config(text=f"平均點數：{avg_points:.1f}")
         self.bust_rate_label.config(text=f"爆牌率：{bust_rate:.2%}")
@@ -518,150 +659,288 @@ class BlackjackGUI:
             elapsed_time = current_time - self.start_time
             self.elapsed_time_label.config(text=f"經過時間：{elapsed_time:.1f} 秒")
         
-        def update_chart():
-            try:
-                if self.chart_type.get() == "最終手牌點數分佈":
-                    ResultPlotter.plot_distribution(results, strategy, self.img_dir)
-                    self.current_image_path = os.path.join(self.img_dir, f"{strategy}_distribution.png")
-                else:
-                    aggregated_results = {s: [r for pid in self.simulator.results[s] for r in self.simulator.results[s][pid]] 
-                                        for s in self.simulator.results}
-                    ResultPlotter.plot_comparison(aggregated_results, self.img_dir)
-                    self.current_image_path = os.path.join(self.img_dir, "strategy_comparison.png")
-                self.resize_images()
-            except Exception as e:
-                print(f"圖表更新失敗: {e}")
+        bust_halfwidth, ev_halfwidth = stats.halfwidths()
+        if stats.count > 1:
+            self.halfwidth_label.config(
+                text=f"信賴區間半寬：爆牌率 ±{bust_halfwidth:.3%}，期望值 ±{ev_halfwidth:.3f}{self.target_text()}"
+            )
         
-        self.root.after(0, update_chart)
+        if self.simulator.instrumentation is not None:
+            self.instrumentation_label.config(text=self.simulator.instrumentation.summary_text(strategy))
+        
+        self.refresh_chart(strategy, stats)
         
         if self.show_log.get() and logs:
-            self.log_text.config(state='normal')
-            self.log_text.delete(1.0, tk.END)
-            max_rounds = max(len(logs[pid]) for pid in logs)
-            for round_num in range(1, max_rounds + 1):
-                self.log_text.insert(tk.END, f"\n第 {round_num} 局：\n{'-'*50}\n")
-                for player_id in sorted(logs.keys()):
-                    if round_num <= len(logs[player_id]):
-                        log = logs[player_id][round_num - 1]
-                        self.log_text.insert(tk.END, f"莊家 - 玩家 {player_id}：\n{log}\n\n")
-            self.log_text.config(state='disabled')
-            self.log_text.see(tk.END)
+            if self.log_viewer.follow:
+                self.log_viewer.show(strategy)
+            else:
+                self.log_viewer.refresh()
+
+        # 期望點數總和即下一張牌的期望點數，直接取自牌堆維護的點數索引
+        if expected_card_value is not None:
+            self.total_ev_label.config(text=f"期望點數總和：{expected_card_value:.1f}")
 
         if remaining_cards and self.expectation_table:
             try:
                 for item in self.expectation_table.get_children():
                     self.expectation_table.delete(item)
-                total_cards = sum(remaining_cards.values())
+                total_cards = sum(remaining_cards)
                 counts = {}
                 probabilities = {}
                 expected_values = {}
-                point_values = {'A': 11, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10, 'J': 10, 'Q': 10, 'K': 10}
-                total_ev = 0
-                for rank in ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']:
-                    count = remaining_cards.get(rank, 0)
+                for index, rank in enumerate(RANKS):
+                    count = remaining_cards[index]
                     counts[rank] = str(count)
                     prob = count / total_cards if total_cards > 0 else 0
                     probabilities[rank] = f"{prob:.2f}"
-                    ev = point_values[rank] * prob
+                    ev = RANK_VALUES[index] * prob
                     expected_values[rank] = f"{ev:.2f}"
-                    total_ev += ev
                 self.expectation_table.insert('', 'end', values=['張數'] + [counts[rank] for rank in ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']])
                 self.expectation_table.insert('', 'end', values=['概率'] + [probabilities[rank] for rank in ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']])
                 self.expectation_table.insert('', 'end', values=['期望值'] + [expected_values[rank] for rank in ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']])
-                self.total_ev_label.config(text=f"期望點數總和：{total_ev:.1f}")
             except Exception as e:
                 print(f"期望值表格更新失敗: {e}")
 
-        self.root.update_idletasks()
+    def read_targets(self):
+        """讀取目標精度（爆牌率以百分比輸入）；留空為 None，格式錯誤時拋出 ValueError"""
+        bust_text = self.target_bust_entry.get().strip()
+        ev_text = self.target_ev_entry.get().strip()
+        target_bust = float(bust_text) / 100 if bust_text else None
+        target_ev = float(ev_text) if ev_text else None
+        return target_bust, target_ev
 
-    def start_simulation(self):
+    def target_text(self):
+        targets = self.targets or (None, None)
+        parts = []
+        if targets[0] is not None:
+            parts.append(f"爆牌率 ±{targets[0]:.3%}")
+        if targets[1] is not None:
+            parts.append(f"期望值 ±{targets[1]:.3f}")
+        return f"（目標：{'、'.join(parts)}）" if parts else ""
+
+    def checkpoint_path(self, strategy):
+        return os.path.join(self.checkpoint_dir, f"{strategy}.json")
+
+    def prepare_run(self, strategies):
+        """開始或繼續模擬前的介面與模擬器設定；未選擇策略時返回 False"""
         self.is_running = True
+        self.stopping = False
+        self.simulator.stop_requested = False  # 上一個模擬執行緒已結束，清除未被消耗的停止要求
         self.start_time = time.time()
         self.start_button.config(state='disabled')
+        self.resume_button.config(state='disabled')
         self.stop_button.config(state='normal')
         self.clear_log_button.config(state='disabled')
         self.progress.start()
         
-        num_hands = int(self.num_hands.get())
-        num_players = max(1, min(10, int(self.num_players.get())))
-        selected_strategies = [s for s, var in self.strategy_vars.items() if var.get()]
+        # 未勾選顯示 Log 時不保留牌局記錄；勾選時每位玩家最多保留 log_capacity 局
+        self.simulator.log_capacity = self.settings['log_capacity'] if self.show_log.get() else 0
+        if self.show_instrumentation.get():
+            self.simulator.enable_instrumentation()
+        else:
+            self.simulator.disable_instrumentation()
+            self.instrumentation_label.config(text="")
+        # 固定種子且參數相同的執行直接由執行目錄取得結果（記錄 Log 或效能監測時模擬器不使用目錄）
+        if self.use_catalog.get():
+            if self.catalog is None:
+                self.catalog = RunCatalog(self.catalog_path)
+            self.simulator.catalog = self.catalog
+        else:
+            self.simulator.catalog = None
+        self.simulator.cache_hits.clear()
         
         self.create_expectation_window()
+        self.log_viewer.set_strategies(strategies)
+        
+        if not strategies:
+            self.result_label.config(text="錯誤：請至少選擇一個策略")
+            self.finish_simulation()
+            return False
+        return True
+
+    def launch(self, work, strategies):
+        """在背景執行緒執行 work(bridge, callback_interval)；模擬執行緒只發布快照，
+        所有 Tk 操作都在主執行緒的 poll_bridge 中進行"""
+        bridge = SnapshotBridge()
+        self.bridge = bridge
+        self.read_update_interval()
+        callback_interval = self.settings['update_interval'] / 1000
         
         def run_simulations():
-            if not selected_strategies:
-                self.root.after(0, lambda: self.result_label.config(text="錯誤：請至少選擇一個策略"))
-                self.root.after(0, lambda: self.start_button.config(state='normal'))
-                self.root.after(0, lambda: self.stop_button.config(state='disabled'))
-                self.root.after(0, lambda: self.clear_log_button.config(state='normal'))
-                self.root.after(0, lambda: self.progress.stop())
-                self.is_running = False
+            try:
+                work(bridge, callback_interval)
+            except Exception as e:
+                bridge.close(e)
                 return
+            bridge.close()
             
+        threading.Thread(target=run_simulations, daemon=True).start()
+        self.poll_bridge(bridge, strategies)
+
+    def start_simulation(self):
+        num_hands = int(self.num_hands.get())
+        num_players = max(1, min(10, int(self.num_players.get())))
+        num_workers = max(1, int(self.num_workers.get()))
+        seed_text = self.seed_entry.get().strip()
+        seed = int(seed_text) if seed_text else None
+        try:
+            target_bust, target_ev = self.read_targets()
+        except ValueError:
+            messagebox.showerror("錯誤", "目標精度必須為數字")
+            return
+        try:
+            num_decks = int(self.num_decks_entry.get())
+            shuffle_ratio = float(self.shuffle_ratio_entry.get()) / 100
+            if num_decks < 1 or not 0 <= shuffle_ratio < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("錯誤", "牌堆副數須為正整數，洗牌點須介於 0 到 100 之間")
+            return
+        self.simulator.configure_shoe(num_decks, shuffle_ratio)
+        targeted = target_bust is not None or target_ev is not None
+        selected_strategies = [s for s, var in self.strategy_vars.items() if var.get()]
+        if not self.prepare_run(selected_strategies):
+            return
+        
+        paired = self.paired_mode.get()
+        self.paired_results = None
+        if targeted and (paired or num_workers > 1):
+            messagebox.showwarning("提示", "目標精度模式僅支援單程序執行，本次將忽略目標精度")
+            target_bust = target_ev = None
+        self.targets = (target_bust, target_ev)
+        
+        def work(bridge, callback_interval):
+            if paired:
+                # 共同隨機數模式需要逐牌靴統計，固定以單程序執行
+                self.paired_results = self.simulator.run_paired(
+                    selected_strategies, num_hands, num_players, bridge.publish, seed, callback_interval
+                )
+                return
+            if num_workers > 1:
+                self.simulator.run_parallel(
+                    selected_strategies, num_hands, num_players, bridge.publish, seed, num_workers
+                )
+                return
+            # 單程序模式定期寫入檢查點，停止或中斷後可由「繼續模擬」接續
             for strategy in selected_strategies:
-                if self.is_running:
-                    self.simulator.run_simulation(strategy, num_hands, num_players, self.update_results)
+                if not self.simulator.run_simulation(strategy, num_hands, num_players, bridge.publish, seed,
+                                                     callback_interval=callback_interval,
+                                                     checkpoint_path=self.checkpoint_path(strategy),
+                                                     target_bust_halfwidth=target_bust,
+                                                     target_ev_halfwidth=target_ev):
+                    break
+        
+        self.launch(work, selected_strategies)
+
+    def resume_simulation(self):
+        """由檢查點繼續先前停止或中斷的模擬"""
+        strategies = [s for s in self.strategies_cn if os.path.exists(self.checkpoint_path(s))]
+        if not strategies:
+            messagebox.showinfo("提示", "沒有可繼續的模擬")
+            return
+        if not self.prepare_run(strategies):
+            return
+        self.targets = None  # 檢查點內的目標精度仍有效，僅不顯示目標值
+        
+        def work(bridge, callback_interval):
+            for strategy in strategies:
+                if not self.simulator.resume_simulation(self.checkpoint_path(strategy), bridge.publish,
+                                                        callback_interval=callback_interval):
+                    break
+        
+        self.launch(work, strategies)
+
+    def read_update_interval(self):
+        """讀取主畫面的更新間隔（毫秒），低於下限時調整為下限；無效輸入沿用目前設定"""
+        try:
+            self.settings['update_interval'] = max(MIN_UPDATE_INTERVAL, int(self.update_interval.get()))
+        except ValueError:
+            pass
+        self.update_interval.delete(0, tk.END)
+        self.update_interval.insert(0, str(self.settings['update_interval']))
+
+    def poll_bridge(self, bridge, selected_strategies):
+        """定期取出最新快照更新介面，模擬執行緒結束後完成收尾"""
+        if self.bridge is not bridge:
+            return  # 此模擬已收尾
+        done = bridge.done  # 先讀取結束旗標，確保之後取出的快照包含最後一次發布
+        snapshot = bridge.drain()
+        if snapshot is not None:
+            self.update_results(*snapshot)
+        if not done:
+            self.root.after(self.settings['update_interval'], self.poll_bridge, bridge, selected_strategies)
+            return
+        
+        if bridge.error is not None:
+            messagebox.showerror("錯誤", f"模擬失敗: {bridge.error}")
+        else:
+            aggregated_results = dict(self.simulator.strategy_stats)
+            if not aggregated_results:
+                self.result_label.config(text="無模擬結果")
+            else:
+                self.refresh_chart(next(iter(aggregated_results)))
             
-            if self.is_running:
-                aggregated_results = {}
-                for strategy in self.simulator.results:
-                    aggregated_results[strategy] = [
-                        r for pid in self.simulator.results[strategy]
-                        for r in self.simulator.results[strategy][pid]
-                    ]
-                
-                if not aggregated_results:
-                    self.root.after(0, lambda: self.result_label.config(text="無模擬結果"))
-                else:
-                    def update_final_chart():
-                        try:
-                            if self.chart_type.get() == "最終手牌點數分佈":
-                                for strategy in aggregated_results:
-                                    ResultPlotter.plot_distribution(aggregated_results[strategy], strategy, self.img_dir)
-                                if aggregated_results:
-                                    self.current_image_path = os.path.join(self.img_dir, f"{list(aggregated_results.keys())[0]}_distribution.png")
-                                else:
-                                    self.current_image_path = None
-                            else:
-                                ResultPlotter.plot_comparison(aggregated_results, self.img_dir)
-                                self.current_image_path = os.path.join(self.img_dir, "strategy_comparison.png")
-                            
-                            if self.current_image_path:
-                                self.resize_images()
-                        except Exception as e:
-                            print(f"最終圖表更新失敗: {e}")
-                
-                    self.root.after(0, update_final_chart)
-                
-                if self.show_log.get():
-                    self.log_text.config(state='normal')
-                    self.log_text.delete(1.0, tk.END)
-                    for strategy in selected_strategies:
-                        max_rounds = max(len(self.simulator.hand_logs[strategy][pid]) 
-                                       for pid in self.simulator.hand_logs[strategy])
-                        for round_num in range(1, max_rounds + 1):
-                            self.log_text.insert(tk.END, f"\n第 {round_num} 局：\n{'-'*50}\n")
-                            for player_id in sorted(self.simulator.hand_logs[strategy].keys()):
-                                if round_num <= len(self.simulator.hand_logs[strategy][player_id]):
-                                    log = self.simulator.hand_logs[strategy][player_id][round_num - 1]
-                                    self.log_text.insert(tk.END, f"莊家 - 玩家 {player_id}：\n{log}\n\n")
-                    self.log_text.config(state='disabled')
-                    self.log_text.see(tk.END)
+            instrumentation = self.simulator.instrumentation
+            if instrumentation is not None:
+                self.instrumentation_label.config(text=instrumentation.summary_text())
             
-            self.root.after(0, lambda: self.start_button.config(state='normal'))
-            self.root.after(0, lambda: self.stop_button.config(state='disabled'))
-            self.root.after(0, lambda: self.clear_log_button.config(state='normal'))
-            self.root.after(0, lambda: self.progress.stop())
-            self.is_running = False
-            self.start_time = None
+            if self.paired_results:
+                self.show_paired_results(self.paired_results)
             
-        threading.Thread(target=run_simulations, daemon=True).start()
+            convergence = [
+                f"{self.strategies_cn[s]} {self.simulator.convergence[s]['hands']} 局"
+                f"{'達成目標' if self.simulator.convergence[s]['converged'] else '未達目標'}"
+                for s in selected_strategies if s in self.simulator.convergence
+            ]
+            cached = [self.strategies_cn[s] for s in selected_strategies if s in self.simulator.cache_hits]
+            messages = []
+            if convergence:
+                messages.append("目標精度：" + "，".join(convergence))
+            if cached:
+                messages.append("取自執行目錄（未重新模擬）：" + "、".join(cached))
+            if self.stopping:
+                messages.insert(0, "模擬已停止")
+            if messages:
+                self.result_label.config(text="；".join(messages))
+            
+            if self.show_log.get():
+                self.log_viewer.set_strategies(selected_strategies)
+                self.log_viewer.show(self.log_viewer.strategy or selected_strategies[-1])
+        self.finish_simulation()
 
-    def stop_simulation(self):
+    def finish_simulation(self):
+        self.bridge = None
         self.is_running = False
+        self.stopping = False
         self.start_time = None
         self.start_button.config(state='normal')
+        self.resume_button.config(state='normal')
         self.stop_button.config(state='disabled')
         self.clear_log_button.config(state='normal')
         self.progress.stop()
-        self.result_label.config(text="模擬已停止")
+
+    def export_instrumentation(self):
+        """將效能監測資料匯出為 JSON"""
+        if self.simulator.instrumentation is None or not self.simulator.instrumentation.runs:
+            messagebox.showinfo("提示", "尚無效能監測資料，請勾選「效能監測」後執行模擬")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile="instrumentation.json"
+        )
+        if not path:
+            return
+        try:
+            self.simulator.instrumentation.to_json(path)
+        except Exception as e:
+            messagebox.showerror("錯誤", f"效能資料匯出失敗: {e}")
+
+    def stop_simulation(self):
+        """要求模擬停止；按鈕維持停用，直到 poll_bridge 觀察到模擬執行緒結束才由 finish_simulation 恢復"""
+        if not self.is_running or self.stopping:
+            return
+        self.stopping = True
+        self.simulator.request_stop()  # 模擬執行緒在本局結束後停止並寫入檢查點
+        self.stop_button.config(state='disabled')
+        self.result_label.config(text="正在停止…")
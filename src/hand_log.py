@@ -0,0 +1,105 @@
+from deck import CARD_RANKS, CARD_VALUES, card_to_str
+
+
+def format_hand(cards):
+    """將牌碼序列格式化為顯示用字串，例如 ['10♠', '5♦']"""
+    return str([card_to_str(card) for card in cards])
+
+
+def hand_total(cards):
+    """計算牌碼序列的總點數（A 視情況計為 1 或 11）"""
+    total = 0
+    aces = 0
+    for card in cards:
+        if CARD_RANKS[card] == 0:
+            aces += 1
+        total += CARD_VALUES[card]
+    while total > 21 and aces:
+        total -= 10
+        aces -= 1
+    return total
+
+
+class HandRecord:
+    """單局的緊湊記錄：局數、牌碼（bytes）、洗牌前剩餘牌數（-1 表示未洗牌）、最終點數
+
+    文字 Log 僅在顯示或匯出時由 format() 產生。
+    """
+
+    __slots__ = ('round_num', 'cards', 'shuffled_at', 'final_total')
+
+    def __init__(self, round_num, cards, shuffled_at, final_total):
+        self.round_num = round_num
+        self.cards = cards
+        self.shuffled_at = shuffled_at
+        self.final_total = final_total
+
+    def format(self, shuffle_threshold, shuffle_ratio=0.4):
+        """產生與逐局 Log 相同格式的文字"""
+        log = []
+        if self.shuffled_at >= 0:
+            log.append(f"牌堆剩餘 {self.shuffled_at} 張，低於 {shuffle_ratio:.0%}（{shuffle_threshold} 張），已將用過的牌放回並洗牌")
+        cards = self.cards
+        log.append(f"初始手牌: {format_hand(cards[:2])}, 點數: {hand_total(cards[:2])}")
+        for i in range(2, len(cards)):
+            log.append(
+                f"補牌: {card_to_str(cards[i])}, 當前手牌: {format_hand(cards[:i + 1])}, 點數: {hand_total(cards[:i + 1])}"
+            )
+        log.append(f"最終結果: 點數 {self.final_total}{' (爆牌)' if self.final_total > 21 else ''}")
+        return "\n".join(log)
+
+
+class HandLog:
+    """牌局記錄的環形緩衝區：capacity 為保留局數上限（None 不限，0 表示不保留）"""
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity
+        self._records = []
+        self._start = 0  # 緩衝區已滿時最舊記錄的位置
+        self.total_appended = 0  # 累計加入的記錄數（含已被覆蓋者）
+
+    def append(self, record):
+        self.total_appended += 1
+        if self.capacity is None or len(self._records) < self.capacity:
+            self._records.append(record)
+        elif self.capacity > 0:
+            self._records[self._start] = record
+            self._start = (self._start + 1) % self.capacity
+
+    def start_at(self, position):
+        """清空後從累計索引 position 開始記錄（續跑時使索引仍對應局數減一，之前的局視為已被覆蓋）"""
+        self.clear()
+        self.total_appended = position
+
+    @property
+    def first_index(self):
+        """最舊保留記錄的累計索引（之前的記錄已被覆蓋）"""
+        return self.total_appended - len(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, index):
+        """依保留記錄中的位置取得記錄（0 為最舊，支援負索引）"""
+        size = len(self._records)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("HandLog 索引超出範圍")
+        return self._records[(self._start + index) % size]
+
+    def get(self, position):
+        """依累計索引取得記錄（已被覆蓋或尚未加入時返回 None）"""
+        index = position - self.first_index
+        if 0 <= index < len(self._records):
+            return self[index]
+        return None
+
+    def __iter__(self):
+        for index in range(len(self._records)):
+            yield self[index]
+
+    def clear(self):
+        self._records = []
+        self._start = 0
+        self.total_appended = 0
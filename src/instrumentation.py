@@ -0,0 +1,121 @@
+import json
+import time
+
+
+class Instrumentation:
+    """模擬熱點路徑的分段計時與計數；未啟用時模擬器完全不呼叫本類別
+
+    每次 begin_run() 開始一筆新的執行記錄（通常對應一個策略），
+    各階段耗時以秒累計，decision 的耗時包含其中的 composition 查詢。
+    """
+
+    phases = ('draw', 'shuffle', 'decision', 'composition', 'log', 'callback')
+    counters = ('hands', 'hits', 'shuffles', 'decisions')
+    phases_cn = {
+        'draw': '抽牌',
+        'shuffle': '洗牌',
+        'decision': '策略決策',
+        'composition': '組成查詢',
+        'log': '記錄',
+        'callback': '回呼'
+    }
+
+    def __init__(self):
+        self.runs = {}
+        self.current = None
+        self.clock = time.perf_counter
+
+    @classmethod
+    def new_run(cls):
+        return {
+            'times': dict.fromkeys(cls.phases, 0.0),
+            'calls': dict.fromkeys(cls.phases, 0),
+            'counters': dict.fromkeys(cls.counters, 0),
+            'wall_time': 0.0
+        }
+
+    def begin_run(self, label):
+        """開始新的執行記錄（同名記錄會被覆蓋）"""
+        self.current = self.new_run()
+        self.current['started'] = self.clock()
+        self.runs[label] = self.current
+        return self.current
+
+    def end_run(self):
+        if self.current is not None and 'started' in self.current:
+            self.current['wall_time'] = self.clock() - self.current.pop('started')
+
+    def add(self, phase, elapsed, calls=1):
+        self.current['times'][phase] += elapsed
+        self.current['calls'][phase] += calls
+
+    def count(self, counter, amount=1):
+        self.current['counters'][counter] += amount
+
+    def merge_run(self, label, run):
+        """合併工作程序回傳的執行記錄"""
+        target = self.runs.setdefault(label, self.new_run())
+        for key in ('times', 'calls', 'counters'):
+            for name, value in run[key].items():
+                target[key][name] += value
+        target['wall_time'] = max(target['wall_time'], run['wall_time'])
+
+    def report(self):
+        """返回各執行記錄與合計（可直接序列化為 JSON）"""
+        total = self.new_run()
+        for run in self.runs.values():
+            for key in ('times', 'calls', 'counters'):
+                for name, value in run[key].items():
+                    total[key][name] += value
+            total['wall_time'] += run['wall_time']
+        runs = {label: {k: v for k, v in run.items() if k != 'started'} for label, run in self.runs.items()}
+        return {'runs': runs, 'total': total}
+
+    def to_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=4)
+
+    def summary_text(self, label=None):
+        """產生顯示用的簡短摘要（預設為目前執行記錄）"""
+        run = self.runs.get(label) if label is not None else self.current
+        if run is None:
+            return "效能監測：無資料"
+        counters = run['counters']
+        lines = [f"局數 {counters['hands']}，補牌 {counters['hits']}，洗牌 {counters['shuffles']}，決策 {counters['decisions']}"]
+        for phase in self.phases:
+            calls = run['calls'][phase]
+            if calls:
+                lines.append(f"{self.phases_cn[phase]}：{run['times'][phase] * 1000:.1f} ms / {calls} 次")
+        return "\n".join(lines)
+
+
+class TimedDeck:
+    """包裝 Deck，將策略對剩餘牌組成的查詢計入 composition 階段"""
+
+    def __init__(self, deck, instrumentation):
+        self._deck = deck
+        self._instrumentation = instrumentation
+
+    def _timed(self, query):
+        instr = self._instrumentation
+        start = instr.clock()
+        value = query()
+        instr.add('composition', instr.clock() - start)
+        return value
+
+    @property
+    def rank_counts(self):
+        return self._timed(lambda: self._deck.rank_counts)
+
+    @property
+    def composition_key(self):
+        return self._timed(lambda: self._deck.composition_key)
+
+    def remaining_count(self):
+        return self._timed(self._deck.remaining_count)
+
+    def bust_count(self, total):
+        return self._timed(lambda: self._deck.bust_count(total))
+
+    def __getattr__(self, name):
+        return getattr(self._deck, name)
@@ -0,0 +1,103 @@
+import time
+from result_plotter import load_pyplot
+
+TOTALS = list(range(12, 23))
+
+
+class LiveChart:
+    """嵌入 Tk 視窗的常駐圖表：長條高度原地更新，重繪頻率受 max_fps 限制，僅在匯出時寫檔"""
+
+    def __init__(self, master, max_fps=10):
+        load_pyplot()  # 套用字型設定
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.figure = Figure(figsize=(8, 6))
+        self.axes = self.figure.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        self.widget.pack(fill='both', expand=True)
+        self.min_interval = 1 / max_fps
+        self.last_draw = 0.0
+        self.pending = None  # 已排程的延遲重繪
+        self.mode = None  # ('distribution',) 或 ('comparison', 策略名稱元組)
+        self.bars = None
+        self.exact_line = None
+
+    def setup_distribution(self):
+        ax = self.axes
+        ax.clear()
+        self.bars = ax.bar(TOTALS, [0] * len(TOTALS), width=1.0, edgecolor='black', label="模擬")
+        self.exact_line, = ax.plot([], [], 'ro-', label="理論值")
+        ax.set_xlabel("最終點數")
+        ax.set_ylabel("概率")
+        ax.set_xticks(TOTALS)
+        ax.set_xlim(11.5, 22.5)
+        ax.grid(True, alpha=0.3)
+        self.mode = ('distribution',)
+
+    def setup_comparison(self, strategies):
+        ax = self.axes
+        ax.clear()
+        colors = [f"C{i}" for i in range(len(strategies))]
+        self.bars = ax.bar(strategies, [0] * len(strategies), color=colors, alpha=0.7)
+        for bar, strategy in zip(self.bars, strategies):
+            bar.set_label(strategy)
+        ax.set_title("各策略爆牌率比較")
+        ax.set_xlabel("策略")
+        ax.set_ylabel("爆牌率")
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        self.mode = ('comparison', tuple(strategies))
+
+    def show_distribution(self, stats, strategy, exact_distribution=None):
+        """以 StreamingStats 更新最終點數分佈（長條高度為該點數的機率）"""
+        if self.mode != ('distribution',):
+            self.setup_distribution()
+        count = stats.count
+        heights = [stats.histogram[total] / count if count else 0 for total in TOTALS]
+        for bar, height in zip(self.bars, heights):
+            bar.set_height(height)
+        if exact_distribution:
+            exact = [exact_distribution.get(total, 0) for total in TOTALS]
+            self.exact_line.set_data(TOTALS, exact)
+            heights = heights + exact
+            self.axes.legend()
+        else:
+            self.exact_line.set_data([], [])
+            legend = self.axes.get_legend()
+            if legend is not None:
+                legend.remove()
+        self.axes.set_ylim(0, max(max(heights) * 1.1, 0.01))
+        self.axes.set_title(f"{strategy} 最終手牌點數分佈")
+        self.request_draw()
+
+    def show_comparison(self, stats_dict):
+        """以 {策略: StreamingStats} 更新爆牌率比較圖"""
+        strategies = tuple(stats_dict)
+        if self.mode != ('comparison', strategies):
+            self.setup_comparison(list(strategies))
+        rates = [stats_dict[strategy].bust_rate for strategy in strategies]
+        for bar, rate in zip(self.bars, rates):
+            bar.set_height(rate)
+        self.axes.set_ylim(0, max(max(rates, default=0) * 1.1, 0.01))
+        self.request_draw()
+
+    def request_draw(self):
+        """距上次重繪未達最小間隔時延後一次重繪，期間的多次更新合併為一次"""
+        if self.pending is not None:
+            return
+        wait = self.min_interval - (time.perf_counter() - self.last_draw)
+        if wait <= 0:
+            self.draw()
+        else:
+            self.pending = self.widget.after(int(wait * 1000) + 1, self.draw)
+
+    def draw(self):
+        self.pending = None
+        self.last_draw = time.perf_counter()
+        self.canvas.draw_idle()
+
+    def export(self, path):
+        """將目前圖表寫入檔案"""
+        self.figure.savefig(path)
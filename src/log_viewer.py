@@ -0,0 +1,235 @@
+import tkinter as tk
+import ttkbootstrap as ttkb
+
+
+class HandLogViewer:
+    """虛擬化的牌局 Log 檢視
+
+    文字區只保留 page_size 局，內容直接由模擬器保存的 HandRecord 產生；
+    跟隨最新局時只附加新增的局並移除最舊的局，右側捲軸以局數為單位定位。
+    每位玩家每局記錄一次，因此第 r 局即該玩家 HandLog 的累計索引 r - 1。
+    """
+
+    ALL_PLAYERS = "全部"
+
+    def __init__(self, master, simulator, strategies_cn, page_size=50, font=("微軟正黑體", 10)):
+        self.simulator = simulator
+        self.strategies_cn = strategies_cn
+        self.page_size = page_size
+        self.strategy = None
+        self.player = None  # None 表示顯示全部玩家
+        self.start = 1  # 文字區第一局
+        self.end = 0  # 文字區最後一局（end < start 表示空白）
+        self.follow = True  # 是否跟隨最新局
+        self._strategy_names = []
+
+        self.frame = ttkb.Frame(master)
+        self.frame.pack(fill=tk.BOTH, expand=True)
+
+        toolbar = ttkb.Frame(self.frame)
+        toolbar.pack(fill=tk.X, pady=(0, 5))
+        self.strategy_var = tk.StringVar()
+        self.strategy_combobox = ttkb.Combobox(toolbar, textvariable=self.strategy_var, state="readonly", width=14)
+        self.strategy_combobox.pack(side=tk.LEFT, padx=(0, 5))
+        self.strategy_combobox.bind('<<ComboboxSelected>>', self.on_strategy_selected)
+        ttkb.Label(toolbar, text="玩家：").pack(side=tk.LEFT)
+        self.player_var = tk.StringVar(value=self.ALL_PLAYERS)
+        self.player_combobox = ttkb.Combobox(toolbar, textvariable=self.player_var, state="readonly", width=6)
+        self.player_combobox.pack(side=tk.LEFT, padx=(0, 5))
+        self.player_combobox.bind('<<ComboboxSelected>>', self.on_player_selected)
+        ttkb.Label(toolbar, text="跳至局數：").pack(side=tk.LEFT)
+        self.round_entry = ttkb.Entry(toolbar, width=10)
+        self.round_entry.pack(side=tk.LEFT)
+        self.round_entry.bind('<Return>', self.jump_to_round)
+        ttkb.Button(toolbar, text="跳至", command=self.jump_to_round, bootstyle="secondary").pack(side=tk.LEFT, padx=5)
+        ttkb.Button(toolbar, text="最新", command=self.jump_to_latest, bootstyle="secondary").pack(side=tk.LEFT)
+
+        body = ttkb.Frame(self.frame)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.text = tk.Text(
+            body,
+            height=20,
+            width=50,
+            font=font,
+            wrap=tk.WORD,
+            borderwidth=2,
+            relief="groove"
+        )
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.config(state='disabled')
+        self.scrollbar = ttkb.Scrollbar(body, orient=tk.VERTICAL, command=self.on_scroll, takefocus=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.text.bind(sequence, self.on_mouse_wheel)
+
+    def logs(self):
+        if self.strategy is None:
+            return {}
+        return self.simulator.hand_logs.get(self.strategy, {})
+
+    def round_range(self):
+        """返回目前策略仍保留的 (最早局數, 所有玩家皆已完成的最新局數)"""
+        logs = self.logs()
+        if not logs:
+            return 1, 0
+        first = min(log.first_index for log in logs.values()) + 1
+        last = min(log.total_appended for log in logs.values())
+        return first, last
+
+    def players(self):
+        logs = self.logs()
+        if self.player is not None and self.player in logs:
+            return [self.player]
+        return sorted(logs)
+
+    def format_round(self, round_num):
+        """產生單局（經玩家篩選後）的文字；該局記錄已被覆蓋時返回空字串"""
+        logs = self.logs()
+        parts = []
+        for player_id in self.players():
+            record = logs[player_id].get(round_num - 1)
+            if record is None or record.round_num != round_num:
+                continue
+            parts.append(f"莊家 - 玩家 {player_id}：\n{self.simulator.format_log(record)}\n\n")
+        if not parts:
+            return ""
+        return f"\n第 {round_num} 局：\n{'-'*50}\n" + "".join(parts)
+
+    def set_strategies(self, strategies):
+        self.strategy_combobox.config(values=[self.strategies_cn.get(s, s) for s in strategies])
+        self._strategy_names = list(strategies)
+
+    def show(self, strategy):
+        """切換顯示的策略並跳到最新局"""
+        if strategy != self.strategy:
+            self.strategy = strategy
+            self.strategy_var.set(self.strategies_cn.get(strategy, strategy))
+            logs = self.logs()
+            self.player_combobox.config(values=[self.ALL_PLAYERS] + [str(pid) for pid in sorted(logs)])
+            if self.player is not None and self.player not in logs:
+                self.player = None
+                self.player_var.set(self.ALL_PLAYERS)
+            self.follow = True
+            self.render_tail()
+        else:
+            self.refresh()
+
+    def refresh(self):
+        """跟隨最新局時附加新增的局；否則只更新捲軸位置"""
+        if self.follow:
+            first, last = self.round_range()
+            if last < self.start or self.end < first - 1 or last < self.end:
+                self.render_tail()  # 記錄已重設或已被覆蓋，重新產生
+                return
+            if last > self.end:
+                begin = max(self.end + 1, last - self.page_size + 1)
+                if begin > self.end + 1:
+                    self.render_tail()
+                    return
+                self.text.config(state='normal')
+                self.text.insert(tk.END, "".join(self.format_round(r) for r in range(begin, last + 1)))
+                self.end = last
+                self.trim_head()
+                self.text.config(state='disabled')
+                self.text.see(tk.END)
+        self.update_scrollbar()
+
+    def trim_head(self):
+        """移除超出 page_size 的最舊局（以局標題定位）"""
+        while self.end - self.start + 1 > self.page_size:
+            self.start += 1
+            index = self.text.search(f"\n第 {self.start} 局：", '1.0', tk.END)
+            if index:
+                self.text.delete('1.0', index)
+
+    def render(self, start):
+        """重新產生從 start 開始的 page_size 局"""
+        first, last = self.round_range()
+        start = max(first, min(start, last - self.page_size + 1))
+        end = min(last, start + self.page_size - 1)
+        self.start, self.end = start, end
+        self.text.config(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.insert(tk.END, "".join(self.format_round(r) for r in range(start, end + 1)))
+        self.text.config(state='disabled')
+        self.update_scrollbar()
+
+    def render_tail(self):
+        first, last = self.round_range()
+        self.render(last - self.page_size + 1)
+        self.text.see(tk.END)
+
+    def update_scrollbar(self):
+        first, last = self.round_range()
+        span = last - first + 1
+        if span <= 0:
+            self.scrollbar.set(0, 1)
+            return
+        self.scrollbar.set((self.start - first) / span, (self.end - first + 1) / span)
+
+    def scroll_to(self, start):
+        first, last = self.round_range()
+        self.follow = start + self.page_size > last
+        if self.follow:
+            self.render_tail()
+        else:
+            self.render(start)
+
+    def on_scroll(self, *args):
+        first, last = self.round_range()
+        if args[0] == 'moveto':
+            self.scroll_to(first + int(float(args[1]) * (last - first + 1)))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self.page_size if args[2] == 'pages' else 1)
+            self.scroll_to(self.start + step)
+
+    def on_mouse_wheel(self, event):
+        """文字區捲到頂端或底端時，以半頁為單位移動顯示範圍"""
+        up = event.num == 4 or getattr(event, 'delta', 0) > 0
+        top, bottom = self.text.yview()
+        if up and top <= 0 and self.start > self.round_range()[0]:
+            self.scroll_to(self.start - self.page_size // 2)
+            self.text.yview_moveto(0.5)
+            return "break"
+        if not up and bottom >= 1 and not self.follow:
+            self.scroll_to(self.start + self.page_size // 2)
+            self.text.yview_moveto(0.0 if self.follow else 0.25)
+            return "break"
+        return None
+
+    def jump_to_round(self, event=None):
+        try:
+            round_num = int(self.round_entry.get())
+        except ValueError:
+            return
+        self.scroll_to(round_num)
+        index = self.text.search(f"\n第 {max(round_num, self.start)} 局：", '1.0', tk.END)
+        if index:
+            self.text.see(index)
+
+    def jump_to_latest(self):
+        self.follow = True
+        self.render_tail()
+
+    def on_strategy_selected(self, event=None):
+        index = self.strategy_combobox.current()
+        if 0 <= index < len(self._strategy_names):
+            self.show(self._strategy_names[index])
+
+    def on_player_selected(self, event=None):
+        value = self.player_var.get()
+        self.player = None if value == self.ALL_PLAYERS else int(value)
+        if self.follow:
+            self.render_tail()
+        else:
+            self.render(self.start)
+
+    def clear(self):
+        self.strategy = None
+        self.start, self.end = 1, 0
+        self.follow = True
+        self.strategy_var.set("")
+        self.text.config(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.config(state='disabled')
+        self.scrollbar.set(0, 1)
@@ -0,0 +1,153 @@
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from blackjack_simulation import BlackjackSimulator
+from strategy_registry import registry
+
+
+def _run_cell(cell, num_hands, num_players, seed):
+    """工作程序：模擬單一參數組合（模組層級函式以便程序池序列化）"""
+    start = time.perf_counter()
+    params = dict(cell['params'])
+    # 查表參數（如 stand_on）產生策略變體，其餘為模擬器的可調參數（如 adaptive_bust_limit）
+    base = registry.get(cell['strategy'])
+    table_params = {name: params.pop(name) for name in list(params) if name in base.params}
+    strategy_name = registry.variant(cell['strategy'], **table_params)
+    simulator = BlackjackSimulator(cell['decks'], keep_results=False, log_capacity=0,
+                                   shuffle_ratio=cell['shuffle_ratio'])
+    simulator.set_strategy_params(params)
+    simulator.run_simulation(strategy_name, num_hands, num_players, seed=seed)
+    stats = simulator.strategy_stats[strategy_name]
+    bust_halfwidth, ev_halfwidth = stats.halfwidths()
+    return dict(
+        cell,
+        hands=stats.count,
+        bust_rate=stats.bust_rate,
+        bust_halfwidth=bust_halfwidth,
+        expected_value=stats.mean,
+        ev_halfwidth=ev_halfwidth,
+        elapsed_seconds=time.perf_counter() - start
+    )
+
+
+class ParameterSweep:
+    """參數掃描：對牌堆副數、洗牌點、策略與策略參數的所有組合平行模擬
+
+    每個組合（格）為程序池中的一個工作，完成後立即以一列寫入整齊格式（tidy）的 CSV，
+    中途停止時已完成的格仍保留在檔案中。
+    """
+
+    columns = ['cell', 'decks', 'shuffle_ratio', 'strategy', 'params', 'hands',
+               'bust_rate', 'bust_halfwidth', 'expected_value', 'ev_halfwidth', 'elapsed_seconds']
+
+    def __init__(self, decks=(6,), shuffle_ratios=(0.4,), strategies=('basic',), params=({},),
+                 num_hands=10000, num_players=1, seed=None):
+        self.decks = list(decks)
+        self.shuffle_ratios = list(shuffle_ratios)
+        self.strategies = list(strategies)
+        self.params = [dict(p) for p in params] or [{}]
+        self.num_hands = num_hands
+        self.num_players = num_players
+        self.seed = seed
+        self.validate()
+
+    def validate(self):
+        """在分派工作前檢查每個策略參數組合，未知的策略或參數拋出 ValueError"""
+        for strategy in self.strategies:
+            base = registry.get(strategy)
+            for params in self.params:
+                unknown = set(params) - set(base.params) - set(BlackjackSimulator.tunable_params)
+                if unknown:
+                    raise ValueError(f"策略 {strategy} 不支援參數: {', '.join(sorted(unknown))}")
+
+    def cells(self):
+        """所有參數組合，依 (策略, 策略參數, 副數, 洗牌點) 排序編號"""
+        return [
+            {'cell': index, 'decks': decks, 'shuffle_ratio': ratio, 'strategy': strategy, 'params': params}
+            for index, (strategy, params, decks, ratio) in enumerate(
+                itertools.product(self.strategies, self.params, self.decks, self.shuffle_ratios)
+            )
+        ]
+
+    def run(self, workers=None, output_path=None, on_result=None):
+        """以 workers 個程序執行所有格；每完成一格即寫入 output_path 並呼叫 on_result(row)，返回依格編號排序的列"""
+        cells = self.cells()
+        rows = []
+        output = None
+        writer = None
+        if output_path:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            output = open(output_path, 'w', encoding='utf-8', newline='')
+            writer = csv.writer(output)
+            writer.writerow(self.columns)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_run_cell, cell, self.num_hands, self.num_players, self.seed)
+                    for cell in cells
+                ]
+                for future in as_completed(futures):
+                    row = future.result()
+                    rows.append(row)
+                    if writer is not None:
+                        writer.writerow([json.dumps(row[c], sort_keys=True) if c == 'params' else row[c]
+                                         for c in self.columns])
+                        output.flush()
+                    if on_result:
+                        on_result(row)
+        finally:
+            if output is not None:
+                output.close()
+        return sorted(rows, key=lambda row: row['cell'])
+
+    @staticmethod
+    def load_csv(path):
+        """讀回 run() 寫入的 CSV（數值欄位轉回數字，params 轉回字典）"""
+        converters = {'cell': int, 'decks': int, 'hands': int, 'params': json.loads}
+        with open(path, encoding='utf-8', newline='') as f:
+            return [
+                {key: converters.get(key, float)(value) if key != 'strategy' else value for key, value in row.items()}
+                for row in csv.DictReader(f)
+            ]
+
+    @staticmethod
+    def heatmap(rows, path, value='bust_rate'):
+        """每個 (策略, 策略參數) 一張子圖，縱軸為牌堆副數、橫軸為洗牌點，顏色為 value（bust_rate 或 expected_value）"""
+        import numpy as np
+        from result_plotter import load_pyplot
+        plt = load_pyplot()
+
+        groups = {}
+        for row in rows:
+            groups.setdefault((row['strategy'], json.dumps(row['params'], sort_keys=True)), []).append(row)
+        decks = sorted({row['decks'] for row in rows})
+        ratios = sorted({row['shuffle_ratio'] for row in rows})
+        titles = {'bust_rate': '爆牌率', 'expected_value': '期望值'}
+        labels = registry.labels()
+
+        fig, axes = plt.subplots(1, len(groups), figsize=(4 * len(groups) + 1, 0.6 * len(decks) + 2.5), squeeze=False)
+        for ax, ((strategy, params), group) in zip(axes[0], groups.items()):
+            grid = np.full((len(decks), len(ratios)), np.nan)
+            for row in group:
+                grid[decks.index(row['decks']), ratios.index(row['shuffle_ratio'])] = row[value]
+            image = ax.imshow(grid, cmap='viridis', aspect='auto', origin='lower')
+            for (i, j), cell_value in np.ndenumerate(grid):
+                if not np.isnan(cell_value):
+                    text = f"{cell_value:.1%}" if value == 'bust_rate' else f"{cell_value:.2f}"
+                    ax.text(j, i, text, ha='center', va='center', color='white', fontsize=8)
+            ax.set_xticks(range(len(ratios)), [f"{ratio:.0%}" for ratio in ratios])
+            ax.set_yticks(range(len(decks)), [str(deck) for deck in decks])
+            ax.set_xlabel("洗牌點（剩餘牌比例）")
+            ax.set_ylabel("牌堆副數")
+            suffix = "" if params == '{}' else f"\n{params}"
+            ax.set_title(f"{labels.get(strategy, strategy)}{suffix}")
+            fig.colorbar(image, ax=ax)
+        fig.suptitle(f"參數掃描：{titles.get(value, value)}")
+        fig.tight_layout()
+        fig.savefig(path)
+        plt.close(fig)
+        return path
@@ -1,19 +1,24 @@
-import matplotlib
-matplotlib.use('Agg')  # 使用非交互式後端
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib import font_manager
 import os
+from streaming_stats import StreamingStats
+
+FONT_PATH = "C:/Windows/Fonts/msjh.ttc"  # 微軟正黑體
+_pyplot = None
+
+
+def load_pyplot():
+    """首次繪圖時才載入 matplotlib（非交互式後端），字型查找只執行一次並快取結果"""
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib
+        matplotlib.use('Agg')  # 使用非交互式後端
+        import matplotlib.pyplot as plt
+        from matplotlib import font_manager
 
-class ResultPlotter:
-    @staticmethod
-    def plot_distribution(results, strategy, img_dir='img'):
         # 嘗試使用微軟正黑體，若失敗則使用預設字型
-        font_path = "C:/Windows/Fonts/msjh.ttc"
         try:
-            if os.path.exists(font_path):
-                font_manager.fontManager.addfont(font_path)
-                prop = font_manager.FontProperties(fname=font_path)
+            if os.path.exists(FONT_PATH):
+                font_manager.fontManager.addfont(FONT_PATH)
+                prop = font_manager.FontProperties(fname=FONT_PATH)
                 plt.rcParams['font.family'] = prop.get_name()
             else:
                 print("警告：未找到微軟正黑體，使用預設字型")
@@ -21,10 +26,32 @@ class ResultPlotter:
         except Exception as e:
             print(f"字型載入失敗: {e}，使用預設字型")
             plt.rcParams['font.family'] = 'sans-serif'
+        _pyplot = plt
+    return _pyplot
+
+
+class ResultPlotter:
+    @staticmethod
+    def plot_distribution(results, strategy, img_dir='img', exact_distribution=None):
+        """繪製最終點數分佈；results 可為每局點數列表、numpy 陣列或 StreamingStats，
+        exact_distribution 為 DealerProbabilityEngine 的精確分佈，可單獨繪製或疊加在模擬直方圖上"""
+        import numpy as np
+        plt = load_pyplot()
         
         bins = np.arange(12, 23) - 0.5
         plt.figure(figsize=(8, 6))
-        plt.hist(results, bins=bins, edgecolor='black', density=True)
+        if results is not None and not isinstance(results, StreamingStats) and len(results):
+            # 每局點數列表或陣列（含 ResultStore 的 memmap 欄位）先分塊彙總為直方圖
+            from result_store import column_histogram
+            results = StreamingStats.from_histogram(column_histogram(results))
+        if isinstance(results, StreamingStats) and results.count:
+            # 以直方圖計數除以總局數作為權重，長條高度即為該點數的實際機率
+            plt.hist(np.arange(len(results.histogram)), bins=bins, edgecolor='black',
+                     weights=np.array(results.histogram) / results.count, label="模擬")
+        if exact_distribution:
+            totals = list(range(12, 23))
+            plt.plot(totals, [exact_distribution.get(t, 0) for t in totals], 'ro-', label="理論值")
+            plt.legend()
         plt.title(f"{strategy} 最終手牌點數分佈")
         plt.xlabel("最終點數")
         plt.ylabel("概率")
@@ -36,23 +63,15 @@ class ResultPlotter:
 
     @staticmethod
     def plot_comparison(results_dict, img_dir='img'):
-        # 字型設定同上
-        font_path = "C:/Windows/Fonts/msjh.ttc"
-        try:
-            if os.path.exists(font_path):
-                font_manager.fontManager.addfont(font_path)
-                prop = font_manager.FontProperties(fname=font_path)
-                plt.rcParams['font.family'] = prop.get_name()
-            else:
-                print("警告：未找到微軟正黑體，使用預設字型")
-                plt.rcParams['font.family'] = 'sans-serif'
-        except Exception as e:
-            print(f"字型載入失敗: {e}，使用預設字型")
-            plt.rcParams['font.family'] = 'sans-serif'
+        plt = load_pyplot()
         
         plt.figure(figsize=(8, 6))
         for strategy, results in results_dict.items():
-            bust_rate = sum(1 for x in results if x > 21) / len(results)
+            if not isinstance(results, StreamingStats):
+                # 每局點數列表或陣列（含 memmap 欄位）分塊彙總為直方圖，不建立整欄的布林陣列
+                from result_store import column_histogram
+                results = StreamingStats.from_histogram(column_histogram(results))
+            bust_rate = results.bust_rate
             plt.bar(strategy, bust_rate, label=strategy, alpha=0.7)
         plt.title("各策略爆牌率比較")
         plt.xlabel("策略")
@@ -0,0 +1,133 @@
+import os
+import shutil
+from array import array
+
+from streaming_stats import StreamingStats
+
+
+def column_histogram(values, block=1 << 22):
+    """分塊以 bincount 計算最終點數直方圖；values 可為列表、numpy 陣列或 memmap 欄位
+
+    bincount 會將輸入轉為 intp，分塊後每次只轉換 block 局，memmap 欄位不會整欄載入記憶體。
+    """
+    import numpy as np
+    histogram = np.zeros(StreamingStats.max_total, dtype=np.int64)
+    for start in range(0, len(values), block):
+        histogram += np.bincount(np.asarray(values[start:start + block]), minlength=StreamingStats.max_total)
+    return histogram
+
+
+class ColumnWriter:
+    """單一 (策略, 玩家) 的欄式附加寫入器：先累積在 array 緩衝區，滿 chunk_size 局時寫入檔案"""
+
+    def __init__(self, directory, columns, start_row=0, chunk_size=65536):
+        self.directory = directory
+        self.columns = columns
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+        # 截斷到 start_row 局（續跑時捨棄檢查點之後寫入的資料）
+        for name, typecode, dtype in columns:
+            path = os.path.join(directory, f"{name}.bin")
+            with open(path, 'ab') as f:
+                f.truncate(start_row * array(typecode).itemsize)
+        self.rows = start_row
+        self._buffers = [array(typecode) for name, typecode, dtype in columns]
+        self._pending = 0
+
+    def append(self, final_total, card_count, shuffled, player_id, round_num):
+        buffers = self._buffers
+        buffers[0].append(final_total)
+        buffers[1].append(card_count)
+        buffers[2].append(shuffled)
+        buffers[3].append(player_id)
+        buffers[4].append(round_num)
+        self._pending += 1
+        if self._pending >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        for (name, typecode, dtype), buffer in zip(self.columns, self._buffers):
+            with open(os.path.join(self.directory, f"{name}.bin"), 'ab') as f:
+                buffer.tofile(f)
+        self.rows += self._pending
+        self._buffers = [array(typecode) for name, typecode, dtype in self.columns]
+        self._pending = 0
+
+    close = flush
+
+
+class ResultStore:
+    """每局結果的欄式儲存，目錄結構為 <path>/<策略>/player_<玩家>/<欄位>.bin
+
+    每欄為固定型別的原始二進位檔，讀取時以 numpy.memmap 對應到記憶體，不建立 Python 物件；
+    各玩家的資料連續存放，因此不同程序可各自寫入自己的玩家目錄。
+    """
+
+    # (欄位, array 型別碼, numpy 型別)
+    columns = (
+        ('final_total', 'b', 'int8'),
+        ('card_count', 'B', 'uint8'),
+        ('shuffled', 'B', 'uint8'),  # 本局開始前是否洗牌
+        ('player_id', 'I', 'uint32'),  # 模擬人數不設上限，與局數欄相同寬度
+        ('round', 'I', 'uint32')
+    )
+
+    def __init__(self, path, chunk_size=65536):
+        self.path = path
+        self.chunk_size = chunk_size
+        os.makedirs(path, exist_ok=True)
+
+    def player_dir(self, strategy, player_id):
+        return os.path.join(self.path, strategy, f"player_{player_id}")
+
+    def writer(self, strategy, player_id, start_row=0):
+        """取得某 (策略, 玩家) 的寫入器，從第 start_row 局之後接續寫入"""
+        return ColumnWriter(self.player_dir(strategy, player_id), self.columns, start_row, self.chunk_size)
+
+    def clear(self, strategy):
+        """刪除某策略的全部資料（重新模擬前呼叫）"""
+        shutil.rmtree(os.path.join(self.path, strategy), ignore_errors=True)
+
+    def strategies(self):
+        return sorted(name for name in os.listdir(self.path) if os.path.isdir(os.path.join(self.path, name)))
+
+    def players(self, strategy):
+        directory = os.path.join(self.path, strategy)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(int(name.split('_')[1]) for name in os.listdir(directory) if name.startswith('player_'))
+
+    def column(self, strategy, player_id, name):
+        """以唯讀 numpy.memmap 取得某欄（零複製；空欄位返回長度 0 的陣列）"""
+        import numpy as np
+        dtype = np.dtype(next(dtype for column, typecode, dtype in self.columns if column == name))
+        path = os.path.join(self.player_dir(strategy, player_id), f"{name}.bin")
+        length = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(length,))
+
+    def results(self, strategy):
+        """返回 {玩家: 最終點數陣列}，結構與 BlackjackSimulator.results[strategy] 相同"""
+        return {pid: self.column(strategy, pid, 'final_total') for pid in self.players(strategy)}
+
+    def all_results(self):
+        return {strategy: self.results(strategy) for strategy in self.strategies()}
+
+    def histogram(self, strategy, player_id=None, block=1 << 22):
+        """分塊以 bincount 計算最終點數直方圖（未指定玩家時合併所有玩家），記憶體用量與總局數無關"""
+        player_ids = self.players(strategy) if player_id is None else [player_id]
+        histogram = column_histogram(())
+        for pid in player_ids:
+            histogram += column_histogram(self.column(strategy, pid, 'final_total'), block)
+        return histogram
+
+    def stats(self, strategy, player_id=None):
+        """由直方圖建立 StreamingStats"""
+        return StreamingStats.from_histogram(self.histogram(strategy, player_id))
+
+    def expected_values(self, strategy):
+        """返回 {玩家: 期望值}，與 BlackjackSimulator.expected_values[strategy] 定義相同"""
+        return {pid: self.stats(strategy, pid).mean for pid in self.players(strategy)}
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+
+class RunCatalog:
+    """以 SQLite 保存的模擬結果目錄：依參數雜湊索引每次執行的參數、統計與產出檔案位置
+
+    參數完全相同（含種子）的執行可直接由目錄取得結果；目錄只保存串流統計，不含每局結果與牌局記錄，
+    因此 BlackjackSimulator 僅在 keep_results=False 且 log_capacity=0（建構子預設為 True 與 None，
+    使用目錄時須明確指定）、未使用欄式儲存與效能監測時才查詢或寫入目錄。超過 max_runs 筆或
+    統計資料總量超過 max_bytes 時，依最近使用時間淘汰最舊的紀錄（不刪除產出檔案）。
+    每次操作各自開啟連線，因此可在模擬執行緒與介面執行緒中使用。
+    """
+
+    version = 1  # 模擬邏輯改變導致結果不同時遞增，使舊紀錄失效
+
+    def __init__(self, path='run_catalog.sqlite', max_runs=1000, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_runs = max_runs
+        self.max_bytes = max_bytes
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS runs (
+                    param_hash TEXT PRIMARY KEY,
+                    strategy TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    artifacts TEXT NOT NULL DEFAULT '{}',
+                    size INTEGER NOT NULL,
+                    elapsed REAL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_last_used ON runs (last_used)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @classmethod
+    def param_hash(cls, params):
+        """參數字典的穩定雜湊（鍵排序後的 JSON 的 SHA-256）"""
+        text = json.dumps(dict(params, catalog_version=cls.version), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def lookup(self, param_hash):
+        """取得紀錄的 payload（不存在時返回 None），並更新最近使用時間與命中次數"""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT payload FROM runs WHERE param_hash = ?", (param_hash,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE runs SET last_used = ?, hits = hits + 1 WHERE param_hash = ?",
+                         (time.time(), param_hash))
+        return json.loads(row[0])
+
+    def store(self, param_hash, strategy, params, payload, elapsed=None):
+        """寫入（或取代）一筆紀錄後依容量上限淘汰"""
+        text = json.dumps(payload, ensure_ascii=False)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO runs
+                   (param_hash, strategy, params, payload, artifacts, size, elapsed, created, last_used, hits)
+                   VALUES (?, ?, ?, ?, COALESCE((SELECT artifacts FROM runs WHERE param_hash = ?), '{}'),
+                           ?, ?, ?, ?, 0)""",
+                (param_hash, strategy, json.dumps(params, sort_keys=True, ensure_ascii=False), text,
+                 param_hash, len(text), elapsed, now, now)
+            )
+            self._evict(conn)
+
+    def add_artifact(self, param_hash, name, path):
+        """記錄某次執行的產出檔案位置（如報告、結果檔）"""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT artifacts FROM runs WHERE param_hash = ?", (param_hash,)).fetchone()
+            if row is None:
+                return
+            artifacts = json.loads(row[0])
+            artifacts[name] = os.path.abspath(path)
+            conn.execute("UPDATE runs SET artifacts = ? WHERE param_hash = ?", (json.dumps(artifacts), param_hash))
+
+    def _evict(self, conn):
+        """刪除最久未使用的紀錄，直到筆數與總量都在上限內"""
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM runs").fetchone()
+        if count <= self.max_runs and total <= self.max_bytes:
+            return
+        for param_hash, size in conn.execute("SELECT param_hash, size FROM runs ORDER BY last_used").fetchall():
+            if count <= self.max_runs and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM runs WHERE param_hash = ?", (param_hash,))
+            count -= 1
+            total -= size
+
+    def runs(self):
+        """所有紀錄的摘要（依最近使用時間由新到舊）"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT param_hash, strategy, params, artifacts, size, elapsed, created, last_used, hits "
+                "FROM runs ORDER BY last_used DESC"
+            ).fetchall()
+        return [
+            {
+                'param_hash': row[0], 'strategy': row[1], 'params': json.loads(row[2]),
+                'artifacts': json.loads(row[3]), 'size': row[4], 'elapsed': row[5],
+                'created': row[6], 'last_used': row[7], 'hits': row[8]
+            }
+            for row in rows
+        ]
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM runs")
@@ -0,0 +1,39 @@
+import queue
+
+
+class SnapshotBridge:
+    """模擬執行緒與 Tk 主執行緒之間的快照佇列
+
+    模擬端以 publish() 發布快照，佇列已滿時丟棄最舊者，因此模擬速度不受介面影響；
+    介面端以 after() 定期呼叫 drain() 取得最新快照，多個快照合併為一次更新。
+    """
+
+    def __init__(self, maxsize=8):
+        self._queue = queue.Queue(maxsize)
+        self.done = False  # 模擬執行緒結束後設為 True
+        self.error = None
+
+    def publish(self, *snapshot):
+        while True:
+            try:
+                self._queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def drain(self):
+        """取出佇列中所有快照，僅返回最新的一個（無快照時返回 None）"""
+        latest = None
+        while True:
+            try:
+                latest = self._queue.get_nowait()
+            except queue.Empty:
+                return latest
+
+    def close(self, error=None):
+        """由模擬執行緒在結束時呼叫"""
+        self.error = error
+        self.done = True
@@ -0,0 +1,178 @@
+"""策略登錄表：以 (總點數, 軟牌) 查表或剩餘牌組成規則宣告策略，編譯為扁平查表陣列
+
+各引擎（逐局、批次、多桌、平行程序）與介面、報告的策略清單及名稱都取自 registry。
+新增莊家變體只需在此登錄，例如：
+
+    registry.register(Strategy.threshold('h17', '軟 17 補牌', '軟 17 補牌 (17點停牌)', 17, hit_soft_17=True))
+"""
+
+STAND, HIT, RULE = 0, 1, 2  # 查表動作：停牌、補牌、交由組成規則判斷
+MAX_TOTAL = 32  # 查表的總點數範圍（最大可能點數為 27）
+
+
+def action_index(total, soft):
+    """(總點數, 是否軟牌) 在查表陣列中的位置"""
+    return total * 2 + soft
+
+
+class Strategy:
+    """已編譯的策略：actions[action_index(總點數, 軟牌)] 為 STAND、HIT 或 RULE
+
+    rule 僅在動作為 RULE 時呼叫，可為 BlackjackSimulator 的方法名稱或
+    rule(simulator, total, soft, rank_counts, total_cards, composition_key) 函式；
+    deck_rule 為可選的等價規則 deck_rule(simulator, total, soft, deck)（或方法名稱），
+    直接查詢牌堆的即時索引，逐局模擬時優先使用。
+    """
+
+    def __init__(self, name, label, description, actions, rule=None, deck_rule=None):
+        self.name = name
+        self.label = label  # 介面用的簡稱
+        self.description = description  # 報告與策略勾選框用的完整名稱
+        self.actions = bytes(actions)
+        self.rule = rule
+        self.deck_rule = deck_rule
+        self.params = {}  # 建立時的查表參數（供 StrategyRegistry.variant 產生變體）
+        if RULE in self.actions and rule is None:
+            raise ValueError(f"策略 {name} 的查表包含組成規則，但未提供 rule")
+
+    @property
+    def needs_composition(self):
+        """是否有需要讀取剩餘牌組成的狀態"""
+        return RULE in self.actions
+
+    @property
+    def stand_threshold(self):
+        """純粹「小於某點數補牌」的策略返回該點數，否則返回 None"""
+        if self.needs_composition:
+            return None
+        for stand_on in range(MAX_TOTAL + 1):
+            if all(self.actions[action_index(total, soft)] == (total < stand_on)
+                   for total in range(MAX_TOTAL) for soft in (0, 1)):
+                return stand_on
+        return None
+
+    @classmethod
+    def threshold(cls, name, label, description, stand_on, hit_soft_17=False):
+        """小於 stand_on 點補牌；hit_soft_17 時軟 17 也補牌"""
+        def hit(total, soft):
+            return total < stand_on or (hit_soft_17 and soft and total == 17)
+        strategy = cls.table(name, label, description, hit)
+        strategy.params = {'stand_on': stand_on, 'hit_soft_17': hit_soft_17}
+        return strategy
+
+    @classmethod
+    def table(cls, name, label, description, hit):
+        """由查表宣告：hit 為 {(總點數, 軟牌): 是否補牌} 字典（未列出者停牌）或 hit(總點數, 軟牌) 函式"""
+        lookup = hit if callable(hit) else lambda total, soft: hit.get((total, bool(soft)), False)
+        actions = [STAND] * (MAX_TOTAL * 2)  # 超過 21 點一律停牌
+        for total in range(22):
+            for soft in (0, 1):
+                actions[action_index(total, soft)] = HIT if lookup(total, bool(soft)) else STAND
+        return cls(name, label, description, actions)
+
+    @classmethod
+    def composition(cls, name, label, description, rule, rule_totals, hit_below=None, deck_rule=None):
+        """組成相關規則：總點數在 rule_totals 範圍內交由 rule 判斷，低於 hit_below（預設範圍下限）補牌，其餘停牌"""
+        low = min(rule_totals) if hit_below is None else hit_below
+        actions = [STAND] * (MAX_TOTAL * 2)
+        for total in range(22):
+            action = RULE if total in rule_totals else HIT if total < low else STAND
+            actions[action_index(total, 0)] = action
+            actions[action_index(total, 1)] = action
+        return cls(name, label, description, actions, rule, deck_rule)
+
+    def bind(self, simulator):
+        """返回綁定模擬器的組成規則 decide(total, soft, rank_counts, total_cards, composition_key=None)"""
+        if self.rule is None:
+            return None
+        if isinstance(self.rule, str):
+            return getattr(simulator, self.rule)
+        rule = self.rule
+        return lambda total, soft, rank_counts, total_cards, composition_key=None: rule(
+            simulator, total, soft, rank_counts, total_cards, composition_key
+        )
+
+    def bind_deck(self, simulator):
+        """返回綁定模擬器、以牌堆查詢的組成規則 decide(total, soft, deck)"""
+        if self.deck_rule is not None:
+            if isinstance(self.deck_rule, str):
+                return getattr(simulator, self.deck_rule)
+            deck_rule = self.deck_rule
+            return lambda total, soft, deck: deck_rule(simulator, total, soft, deck)
+        rule = self.bind(simulator)
+        if rule is None:
+            return None
+        return lambda total, soft, deck: rule(total, soft, deck.rank_counts, deck.remaining_count(),
+                                              deck.composition_key)
+
+    def decision(self, simulator):
+        """返回以狀態表示的完整決策 decide(total, soft, rank_counts, total_cards)（供解析引擎使用）"""
+        actions = self.actions
+        rule = self.bind(simulator)
+
+        def decide(total, soft, rank_counts, total_cards):
+            action = actions[action_index(total, soft)]
+            if action == RULE:
+                return rule(total, soft, rank_counts, total_cards)
+            return action == HIT
+        return decide
+
+
+class StrategyRegistry:
+    """依登錄順序保存的策略集合"""
+
+    def __init__(self):
+        self._strategies = {}
+
+    def register(self, strategy):
+        """登錄策略（同名時取代），返回該策略"""
+        self._strategies[strategy.name] = strategy
+        return strategy
+
+    def get(self, name):
+        if name not in self._strategies:
+            raise ValueError(f"未知的策略: {name}")
+        return self._strategies[name]
+
+    def variant(self, base_name, **params):
+        """以查表參數（如 stand_on、hit_soft_17）產生並登錄基礎策略的變體，返回變體名稱（無參數時返回原名稱）"""
+        base = self.get(base_name)
+        if not params:
+            return base_name
+        unknown = set(params) - set(base.params)
+        if unknown:
+            raise ValueError(f"策略 {base_name} 不支援參數: {', '.join(sorted(unknown))}")
+        merged = dict(base.params, **params)
+        suffix = ",".join(f"{key}={value}" for key, value in sorted(params.items()))
+        name = f"{base_name}({suffix})"
+        if name not in self._strategies:
+            self.register(Strategy.threshold(name, f"{base.label}({suffix})", f"{base.description} ({suffix})",
+                                             merged['stand_on'], merged['hit_soft_17']))
+        return name
+
+    def names(self):
+        return list(self._strategies)
+
+    def labels(self):
+        """{策略: 簡稱}"""
+        return {name: strategy.label for name, strategy in self._strategies.items()}
+
+    def descriptions(self):
+        """{策略: 完整名稱}"""
+        return {name: strategy.description for name, strategy in self._strategies.items()}
+
+    def __contains__(self, name):
+        return name in self._strategies
+
+    def __iter__(self):
+        return iter(self._strategies.values())
+
+
+registry = StrategyRegistry()
+registry.register(Strategy.threshold('basic', '基本策略', '基本策略 (17點停牌)', 17))
+registry.register(Strategy.threshold('conservative', '保守策略', '保守策略 (16點停牌)', 16))
+registry.register(Strategy.threshold('aggressive', '激進策略', '激進策略 (18點停牌)', 18))
+registry.register(Strategy.composition('adaptive', '自適應策略', '自適應策略 (基於爆牌概率)',
+                                       'adaptive_decision', range(12, 17), deck_rule='adaptive_deck_decision'))
+registry.register(Strategy.composition('advanced', '高級自適應策略', '高級自適應策略 (基於期望值)',
+                                       'advanced_decision', range(12, 19)))
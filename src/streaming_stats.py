@@ -0,0 +1,94 @@
+class StreamingStats:
+    """串流統計：固定長度最終點數直方圖、爆牌數及 Welford 平均/變異數，記憶體 O(1)
+
+    平均與變異數以 min(點數, 21) 計算（爆牌計為 21），與 calculate_expected_value 一致。
+    """
+
+    max_total = 32  # 直方圖長度（最大可能點數為 27）
+
+    def __init__(self):
+        self.histogram = [0] * self.max_total
+        self.count = 0
+        self.busts = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # 與平均差的平方和（Welford）
+
+    def add(self, total):
+        """加入一局的最終點數"""
+        self.histogram[total] += 1
+        self.count += 1
+        if total > 21:
+            self.busts += 1
+            value = 21
+        else:
+            value = total
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other):
+        """合併另一組統計（平行模擬的各程序結果），返回 self"""
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.busts += other.busts
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+        return self
+
+    @property
+    def bust_rate(self):
+        return self.busts / self.count if self.count else 0.0
+
+    @property
+    def variance(self):
+        """樣本變異數"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def halfwidths(self, z=1.959963984540054):
+        """爆牌率與平均點數的常態近似信賴區間半寬（預設 95%）；少於 2 局時為無限大"""
+        if self.count < 2:
+            return float('inf'), float('inf')
+        p = self.bust_rate
+        return z * (p * (1 - p) / self.count) ** 0.5, z * (self.variance / self.count) ** 0.5
+
+    @classmethod
+    def from_histogram(cls, histogram):
+        """由最終點數直方圖（計數）建立統計；平均與平方和以直方圖精確計算"""
+        stats = cls()
+        stats.histogram = [int(count) for count in histogram]
+        stats.histogram += [0] * (cls.max_total - len(stats.histogram))
+        stats.count = sum(stats.histogram)
+        stats.busts = sum(stats.histogram[22:])
+        if stats.count:
+            values = [min(total, 21) for total in range(len(stats.histogram))]
+            stats.mean = sum(v * c for v, c in zip(values, stats.histogram)) / stats.count
+            stats.m2 = sum(c * (v - stats.mean) ** 2 for v, c in zip(values, stats.histogram))
+        return stats
+
+    def to_dict(self):
+        """轉為可序列化為 JSON 的字典（浮點數以 repr 往返可精確還原）"""
+        return {'histogram': self.histogram, 'count': self.count, 'busts': self.busts, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.histogram = list(data['histogram'])
+        stats.count = data['count']
+        stats.busts = data['busts']
+        stats.mean = data['mean']
+        stats.m2 = data['m2']
+        return stats
+
+    def snapshot(self):
+        """返回目前統計的獨立副本（僅複製固定長度的直方圖）"""
+        copy = StreamingStats.__new__(StreamingStats)
+        copy.histogram = self.histogram[:]
+        copy.count = self.count
+        copy.busts = self.busts
+        copy.mean = self.mean
+        copy.m2 = self.m2
+        return copy
@@ -0,0 +1,164 @@
+import numpy as np
+from blackjack_simulation import BlackjackSimulator
+from deck import NUM_CLASSES, RANK_VALUES
+from streaming_stats import StreamingStats
+from strategy_registry import registry, HIT, RULE
+
+
+class TableEngine:
+    """多桌引擎：以結構陣列（struct-of-arrays）同時推進大量獨立牌桌
+
+    支援策略登錄表中的所有查表策略，以及內建的 adaptive_decision / advanced_decision 組成規則。
+
+    每桌的牌堆只保存剩餘點數類別計數與剩餘張數，抽牌時依剩餘組成直接抽樣點數類別，
+    不保存牌序或已用牌（與逐張洗牌的牌堆在分佈上等價）；每桌另有最終點數直方圖，
+    單桌或合計的統計在需要時才由直方圖計算。
+    """
+
+    max_total = StreamingStats.max_total
+
+    def __init__(self, num_tables, num_decks=6, seed=None, simulator=None, shuffle_ratio=0.4):
+        self.num_tables = num_tables
+        self.num_decks = num_decks
+        self.total_cards = num_decks * 52
+        self.shuffle_threshold = int(self.total_cards * shuffle_ratio)  # 與 BlackjackSimulator 相同的洗牌規則
+        self.rng = np.random.default_rng(seed)
+        # 決策邏輯取自模擬器，確保與逐局模擬的策略定義一致
+        self.simulator = simulator or BlackjackSimulator(num_decks)
+        self.class_values = np.array(RANK_VALUES[:NUM_CLASSES], dtype=np.int16)  # A=11, 2..9, 10
+        self.full_counts = np.array([4 * num_decks] * 9 + [16 * num_decks], dtype=np.uint16)
+        self.reset()
+
+    def reset(self):
+        """所有牌桌換上新牌靴並清空統計"""
+        self.counts = np.tile(self.full_counts, (self.num_tables, 1))  # (桌數, 點數類別) 剩餘張數
+        self.remaining = np.full(self.num_tables, self.total_cards, dtype=np.uint16)
+        self.shuffles = np.ones(self.num_tables, dtype=np.uint32)
+        self.histograms = np.zeros((self.num_tables, self.max_total), dtype=np.uint32)
+        self.rounds = 0
+
+    @property
+    def bytes_per_table(self):
+        """每桌狀態佔用的位元組數"""
+        arrays = (self.counts, self.remaining, self.shuffles, self.histograms)
+        return sum(array.nbytes for array in arrays) // self.num_tables
+
+    def _draw(self, rows):
+        """替 rows 中的牌桌各抽一張牌，依剩餘組成抽樣點數類別並更新計數，返回點數
+
+        牌局中途牌堆用盡的牌桌與 Deck.draw 相同，立即將所有牌放回。
+        """
+        exhausted = rows[self.remaining[rows] == 0]
+        if exhausted.size:
+            self.counts[exhausted] = self.full_counts
+            self.remaining[exhausted] = self.total_cards
+            self.shuffles[exhausted] += 1
+        counts = self.counts[rows]
+        cumulative = counts.cumsum(axis=1, dtype=np.int32)
+        picks = (self.rng.random(rows.size) * self.remaining[rows]).astype(np.int32)
+        classes = (cumulative <= picks[:, None]).sum(axis=1)
+        counts[np.arange(rows.size), classes] -= 1
+        self.counts[rows] = counts
+        self.remaining[rows] -= 1
+        return self.class_values[classes]
+
+    def decision_tables(self, strategy_name):
+        """將策略編譯為向量化的補牌判斷 hit(total, soft, rows) -> 布林陣列"""
+        strategy = registry.get(strategy_name)
+        actions = np.frombuffer(strategy.actions, dtype=np.uint8)
+        if not strategy.needs_composition:
+            hits = actions == HIT
+            return lambda total, soft, rows: hits[total * 2 + (soft > 0)]
+
+        totals = np.arange(self.max_total)
+        if strategy.rule == 'adaptive_decision':
+            # busts[總點數, 類別]：補到該類別的牌是否爆牌（A 以 11 點計，與 adaptive_decision 一致）
+            busts = (totals[:, None] + self.class_values[None, :] > 21).astype(np.int32)
+
+            def rule(total, soft, rows):
+                remaining = self.remaining[rows].astype(np.int32)
+                bust_cards = (self.counts[rows] * busts[total]).sum(axis=1)
+                return (remaining > 0) & (bust_cards < self.simulator.adaptive_bust_limit * remaining)
+        elif strategy.rule == 'advanced_decision':
+            # weights[總點數, 軟牌, 類別]：與 hit_weights 相同的整數權重，10 點類別取 '10' 的權重
+            weights = np.zeros((self.max_total, 2, NUM_CLASSES), dtype=np.int32)
+            for total in range(12, 19):
+                for soft in (0, 1):
+                    weights[total, soft] = self.simulator.hit_weights(total, bool(soft))[:NUM_CLASSES]
+
+            def rule(total, soft, rows):
+                gain = (self.counts[rows] * weights[total, (soft > 0).astype(np.intp)]).sum(axis=1)
+                return (self.remaining[rows] > 0) & (gain > 0)
+        else:
+            raise ValueError(f"多桌引擎不支援策略: {strategy_name}")
+
+        def hit(total, soft, rows):
+            action = actions[total * 2 + (soft > 0)]
+            return (action == HIT) | ((action == RULE) & rule(total, soft, rows))
+        return hit
+
+    def step(self, hit):
+        """所有牌桌各進行一局"""
+        # 剩餘牌數低於洗牌點的牌桌將已用牌放回
+        shuffle = self.remaining <= self.shuffle_threshold
+        if shuffle.any():
+            self.counts[shuffle] = self.full_counts
+            self.remaining[shuffle] = self.total_cards
+            self.shuffles[shuffle] += 1
+
+        rows = np.arange(self.num_tables)
+        first = self._draw(rows)
+        second = self._draw(rows)
+        total = first + second
+        soft = (first == 11).astype(np.int8) + (second == 11)
+        over = total > 21  # 僅 A+A 會超過 21
+        total[over] -= 10
+        soft[over] -= 1
+
+        # 補牌：每一步只處理尚未停牌的牌桌
+        active = rows[hit(total, soft, rows)]
+        while active.size:
+            card = self._draw(active)
+            new_total = total[active] + card
+            new_soft = soft[active] + (card == 11)
+            over = (new_total > 21) & (new_soft > 0)
+            while over.any():  # 軟 21 再補 A 時需降兩張 A
+                new_total[over] -= 10
+                new_soft[over] -= 1
+                over = (new_total > 21) & (new_soft > 0)
+            total[active] = new_total
+            soft[active] = new_soft
+            active = active[hit(new_total, new_soft, active)]
+
+        self.histograms[rows, total] += 1
+        self.rounds += 1
+
+    def run(self, strategy_name, num_rounds, update_callback=None, callback_every=100):
+        """每桌模擬 num_rounds 局；update_callback(engine) 每 callback_every 局呼叫一次"""
+        hit = self.decision_tables(strategy_name)
+        for round_num in range(1, num_rounds + 1):
+            self.step(hit)
+            if update_callback and round_num % callback_every == 0:
+                update_callback(self)
+        return self.stats()
+
+    def table_stats(self, table):
+        """單桌的 StreamingStats"""
+        return StreamingStats.from_histogram(self.histograms[table])
+
+    def stats(self):
+        """所有牌桌合計的 StreamingStats"""
+        return StreamingStats.from_histogram(self.histograms.sum(axis=0, dtype=np.int64))
+
+    def table_summary(self):
+        """各桌的局數、爆牌率與期望值陣列（向量化計算）"""
+        histograms = self.histograms.astype(np.int64)
+        hands = histograms.sum(axis=1)
+        points = np.minimum(np.arange(self.max_total), 21)
+        safe = np.maximum(hands, 1)
+        return {
+            'hands': hands,
+            'bust_rate': histograms[:, 22:].sum(axis=1) / safe,
+            'expected_value': histograms @ points / safe,
+            'shuffles': self.shuffles.copy()
+        }
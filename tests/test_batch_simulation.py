@@ -0,0 +1,34 @@
+"""NumPy 批次引擎與逐局模擬在統計上等價"""
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from batch_simulation import BatchSimulator  # noqa: E402
+from blackjack_simulation import BlackjackSimulator  # noqa: E402
+from streaming_stats import StreamingStats  # noqa: E402
+
+
+@pytest.mark.parametrize('strategy, shuffle_ratio', [('basic', 0.4), ('aggressive', 0.4), ('conservative', 0.1)])
+def test_batch_matches_serial(strategy, shuffle_ratio):
+    batch = BatchSimulator(6, shuffle_ratio=shuffle_ratio).run_batch(strategy, 100, 1000, seed=1)
+    batch_stats = StreamingStats.from_histogram(batch['histogram'])
+
+    simulator = BlackjackSimulator(6, keep_results=False, log_capacity=0, shuffle_ratio=shuffle_ratio)
+    simulator.run_simulation(strategy, 25000, 4, seed=1)
+    serial_stats = simulator.strategy_stats[strategy]
+
+    # 兩個獨立樣本的差異應在合併標準誤的 4.5 倍以內（固定種子，結果可重現）
+    a, b = batch_stats, serial_stats
+    bust_se = math.sqrt(a.bust_rate * (1 - a.bust_rate) / a.count + b.bust_rate * (1 - b.bust_rate) / b.count)
+    mean_se = math.sqrt(a.variance / a.count + b.variance / b.count)
+    assert abs(a.bust_rate - b.bust_rate) < 4.5 * bust_se
+    assert abs(a.mean - b.mean) < 4.5 * mean_se
+
+
+def test_batch_rejects_composition_strategies():
+    with pytest.raises(ValueError):
+        BatchSimulator(6).run_batch('adaptive', 10, 10, seed=1)
@@ -0,0 +1,64 @@
+"""中途停止並由檢查點續跑的結果必須與相同種子、未中斷的執行完全相同"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from blackjack_simulation import BlackjackSimulator  # noqa: E402
+
+HANDS, PLAYERS, SEED = 60, 3, 7
+
+
+def log_entries(hand_log):
+    return [(record.round_num, record.cards, record.shuffled_at, record.final_total) for record in hand_log]
+
+
+@pytest.mark.parametrize('keep_results', [True, False])
+@pytest.mark.parametrize('strategy', ['basic', 'advanced'])
+def test_stop_and_resume_matches_uninterrupted_run(tmp_path, keep_results, strategy):
+    baseline = BlackjackSimulator(2, keep_results=keep_results)
+    assert baseline.run_simulation(strategy, HANDS, PLAYERS, seed=SEED)
+
+    checkpoint_path = str(tmp_path / 'run.json')
+    interrupted = BlackjackSimulator(2, keep_results=keep_results)
+
+    def stop_partway(strategy_name, stats, logs, remaining_cards, expected_card_value):
+        # 第 23 局中途要求停止：本局完成後於第 24 局前停止，且之前已於第 10、20 局寫入定期檢查點
+        if stats.count == 23 * PLAYERS - 1:
+            interrupted.request_stop()
+
+    assert not interrupted.run_simulation(strategy, HANDS, PLAYERS, update_callback=stop_partway, seed=SEED,
+                                          checkpoint_path=checkpoint_path, checkpoint_every=10)
+    assert os.path.exists(checkpoint_path)
+
+    resumed = BlackjackSimulator(keep_results=keep_results)
+    assert resumed.resume_simulation(checkpoint_path, checkpoint_every=10)
+    assert not os.path.exists(checkpoint_path)
+
+    assert resumed.strategy_stats[strategy].to_dict() == baseline.strategy_stats[strategy].to_dict()
+    for pid in range(1, PLAYERS + 1):
+        assert resumed.stats[strategy][pid].to_dict() == baseline.stats[strategy][pid].to_dict()
+        assert list(resumed.results[strategy][pid]) == list(baseline.results[strategy][pid])
+        assert len(resumed.results[strategy][pid]) == (HANDS if keep_results else 0)
+        assert resumed.expected_values[strategy][pid] == baseline.expected_values[strategy][pid]
+
+        # 停止前的局由中斷的執行記錄，續跑的 Log 由第 24 局開始且累計索引仍對應局數
+        before = log_entries(interrupted.hand_logs[strategy][pid])
+        after = log_entries(resumed.hand_logs[strategy][pid])
+        assert [entry[0] for entry in before] == list(range(1, 24))
+        assert resumed.hand_logs[strategy][pid].first_index == 23
+        assert before + after == log_entries(baseline.hand_logs[strategy][pid])
+
+
+@pytest.mark.parametrize('options', [
+    {'checkpoint_path': 'run.json'},
+    {'common_random_numbers': True},
+    {'target_bust_halfwidth': 0.01},
+    {'target_ev_halfwidth': 0.05},
+])
+def test_parallel_run_rejects_single_process_options(options):
+    # 平行模式無法寫入檢查點或提前停止，不可默默忽略這些選項
+    with pytest.raises(ValueError):
+        BlackjackSimulator().run_simulation('basic', 10, 2, seed=1, workers=2, **options)
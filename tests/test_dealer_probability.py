@@ -0,0 +1,54 @@
+"""解析引擎的精確分佈須與大量固定種子的蒙地卡羅模擬在統計誤差內一致"""
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from blackjack_simulation import BlackjackSimulator  # noqa: E402
+from dealer_probability import DealerProbabilityEngine  # noqa: E402
+from deck import Deck  # noqa: E402
+from strategy_registry import registry  # noqa: E402
+
+HANDS = 100000
+
+
+def monte_carlo(strategy_name, hands=HANDS, seed=1):
+    """單副牌、每局開始前洗牌（洗牌點 51 張），使每局都由完整牌堆開局"""
+    simulator = BlackjackSimulator(1, keep_results=False, log_capacity=0, shuffle_ratio=0.999)
+    simulator.reset_strategy(strategy_name, 1)
+    strategy = registry.get(strategy_name)
+    deck = Deck(1, seed=seed)
+    counts = [0] * DealerProbabilityEngine.max_total
+    for round_num in range(1, hands + 1):
+        counts[simulator.simulate_hand(strategy, strategy_name, 1, deck, round_num)[0]] += 1
+    return counts
+
+
+@pytest.mark.parametrize('strategy_name', ['basic', 'adaptive', 'advanced'])
+def test_exact_distribution_matches_monte_carlo(strategy_name):
+    engine = DealerProbabilityEngine(1)
+    exact = engine.final_distribution(strategy_name)
+    assert math.isclose(sum(exact.values()), 1.0)
+
+    counts = monte_carlo(strategy_name)
+    for total, count in enumerate(counts):
+        p = exact.get(total, 0.0)
+        if p == 0:
+            assert count == 0, total
+            continue
+        se = math.sqrt(p * (1 - p) / HANDS)
+        assert abs(count / HANDS - p) < 4.5 * se, (total, count / HANDS, p)
+
+    bust = sum(counts[22:]) / HANDS
+    exact_bust = DealerProbabilityEngine.bust_rate(exact)
+    assert abs(bust - exact_bust) < 4.5 * math.sqrt(exact_bust * (1 - exact_bust) / HANDS)
+
+
+def test_distribution_from_depleted_shoe():
+    # 只剩 10 點牌時：起始兩張必為 20，並依策略停牌
+    rank_counts = [0] * 9 + [4, 0, 0, 0]
+    distribution = DealerProbabilityEngine(1).final_distribution('basic', rank_counts)
+    assert distribution == {20: 1.0}
@@ -0,0 +1,20 @@
+"""欄式結果儲存的寫入與讀回"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from blackjack_simulation import BlackjackSimulator  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+
+
+def test_player_ids_above_255_round_trip(tmp_path):
+    store = ResultStore(str(tmp_path))
+    simulator = BlackjackSimulator(keep_results=True, log_capacity=0, result_store=store)
+    simulator.run_simulation('basic', 3, 300, seed=1)
+
+    assert store.players('basic') == list(range(1, 301))
+    for pid in (1, 256, 300):
+        assert store.column('basic', pid, 'player_id').tolist() == [pid] * 3
+        assert store.column('basic', pid, 'round').tolist() == [1, 2, 3]
+        assert store.column('basic', pid, 'final_total').tolist() == simulator.results['basic'][pid]
@@ -0,0 +1,38 @@
+"""執行目錄只保存可由使用者重現、且僅需串流統計的執行"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from blackjack_simulation import BlackjackSimulator  # noqa: E402
+from run_catalog import RunCatalog  # noqa: E402
+
+
+def test_seeded_run_is_served_from_catalog(tmp_path):
+    catalog = RunCatalog(str(tmp_path / 'catalog.sqlite'))
+    first = BlackjackSimulator(2, keep_results=False, log_capacity=0, catalog=catalog)
+    first.run_simulation('basic', 200, 2, seed=5)
+    assert len(catalog.runs()) == 1
+
+    second = BlackjackSimulator(2, keep_results=False, log_capacity=0, catalog=catalog)
+    second.run_simulation('basic', 200, 2, seed=5)
+    assert 'basic' in second.cache_hits
+    assert second.strategy_stats['basic'].to_dict() == first.strategy_stats['basic'].to_dict()
+
+
+def test_default_simulator_does_not_use_catalog(tmp_path):
+    # 預設保留每局結果與牌局記錄，目錄無法還原這些資料
+    catalog = RunCatalog(str(tmp_path / 'catalog.sqlite'))
+    BlackjackSimulator(2, catalog=catalog).run_simulation('basic', 200, 2, seed=5)
+    assert catalog.runs() == []
+
+
+def test_unseeded_paired_run_is_not_stored(tmp_path):
+    catalog = RunCatalog(str(tmp_path / 'catalog.sqlite'))
+    simulator = BlackjackSimulator(2, keep_results=False, log_capacity=0, catalog=catalog)
+    simulator.run_paired(['basic', 'aggressive'], 200, 2)
+    assert catalog.runs() == []
+    assert simulator.catalog is catalog
+
+    simulator.run_paired(['basic', 'aggressive'], 200, 2, seed=5)
+    assert len(catalog.runs()) == 2
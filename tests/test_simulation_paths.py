@@ -0,0 +1,47 @@
+"""逐局模擬的一般路徑與效能監測路徑必須得到相同結果"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from blackjack_simulation import BlackjackSimulator  # noqa: E402
+from deck import Deck, card_from_str  # noqa: E402
+from strategy_registry import Strategy, registry  # noqa: E402
+
+# 軟 21 仍補牌的查表策略：補到的 A 可能需要連續降兩張 A（32 -> 22 -> 12）
+HIT_SOFT_21 = Strategy.table('hit_soft_21', '軟 21 補牌', '軟 21 補牌', lambda total, soft: total < 17 or soft)
+
+
+def play(strategy, instrumented, hands=5000, seed=1):
+    simulator = BlackjackSimulator(keep_results=False, log_capacity=0)
+    if instrumented:
+        simulator.enable_instrumentation().begin_run(strategy.name)
+    simulator.reset_strategy(strategy.name, 1)
+    deck = Deck(6, seed=seed)
+    return [simulator.simulate_hand(strategy, strategy.name, 1, deck, round_num)[0]
+            for round_num in range(1, hands + 1)]
+
+
+def test_paths_agree_for_registered_strategies():
+    for strategy in registry:
+        assert play(strategy, False, 2000) == play(strategy, True, 2000), strategy.name
+
+
+def test_paths_agree_when_hitting_soft_21():
+    assert play(HIT_SOFT_21, False) == play(HIT_SOFT_21, True)
+
+
+def test_second_ace_after_soft_21_is_lowered():
+    class FixedDeck(Deck):
+        def __init__(self, cards):
+            super().__init__(1, seed=0)
+            self.queue = [card_from_str(card) for card in cards]
+
+        def draw(self):
+            return self.queue.pop(0) if self.queue else super().draw()
+
+    simulator = BlackjackSimulator(keep_results=False, log_capacity=0)
+    simulator.reset_strategy(HIT_SOFT_21.name, 1)
+    deck = FixedDeck(['7', '3', 'A', 'A', '5'])
+    total, _ = simulator.simulate_hand(HIT_SOFT_21, HIT_SOFT_21.name, 1, deck, 1)
+    assert total == 17  # 7+3+A(11)=21 軟，+A -> 12 硬，+5 -> 17